@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Benchmark the data pipeline on synthetic datasets.
+Generates transaction, population and GDP tables plus a country registry
+with many more countries, regions and periods (years or months) than the
+~140-row sample CSVs, then times each stage of the real code path:
+
+    load     read the transaction table (tables.load_table; CSV, or Arrow/Parquet with --storage)
+    join     resolve countries to ISO3 and line up population / GDP (countries, reference)
+    compute  per capita, % of GDP and map styles (percapita, choropleth)
+    write    write the derived CSVs (pipeline.write_metric)
+    inject   build the page asset with its styles and growth analytics, write it
+             and render the page slots (export_data, choropleth, growth, render_pages)
+
+Every stage records wall time, throughput and tracemalloc peak memory.
+Results go to a JSON file tagged with the git commit, so runs on different
+commits can be compared with --compare.
+
+Usage:
+    python3 scripts/benchmark.py                          # 10x, 100x, 1000x
+    python3 scripts/benchmark.py --scales 10 --periods monthly
+    python3 scripts/benchmark.py --storage arrow         # load from a memory-mapped Arrow copy
+    python3 scripts/benchmark.py --compare data/benchmarks/<old>.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import choropleth
+import export_data
+import pipeline
+import render_pages
+from countries import CountryRegistry
+from percapita import per_capita_block
+from reference import REFERENCES, ReferenceStore
+from tables import load_table, period_year, write_columnar
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+RESULTS_DIR = os.path.join(PROJECT_ROOT, 'data', 'benchmarks')
+PAGES_DIR = os.path.join(PROJECT_ROOT, 'pages')
+
+BASE_COUNTRIES = 144  # rows in the sample transaction CSV
+DEFAULT_SCALES = [10, 100, 1000]
+DEFAULT_REGIONS = 20
+FIRST_YEAR, LAST_YEAR = 2018, 2025
+SEED = 2025
+
+STAGES = ['load', 'join', 'compute', 'write', 'inject']
+
+
+def git_commit():
+    """(commit hash, True if the working tree has uncommitted changes), or (None, None)."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=PROJECT_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout
+        return commit, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def period_names(first_year, last_year, periods):
+    """Column names for every year, or every month ("2024-01") of every year."""
+    if periods == 'monthly':
+        return [f'{year}-{month:02d}' for year in range(first_year, last_year + 1) for month in range(1, 13)]
+    return [str(year) for year in range(first_year, last_year + 1)]
+
+
+def generate_workspace(root, countries, regions, columns, seed=SEED):
+    """
+    Write a synthetic dataset under root:
+        countries.csv, reference/gdp.csv, reference/population.csv and
+        data/Payments Trends Report 2025 - with coordinates.csv
+    Values follow the shape of the real data: log-normal market sizes
+    growing 5-25% a year, populations of 0.1-1500 million.
+    """
+    rng = np.random.default_rng(seed)
+    codes = [f'X{i:06d}' for i in range(countries)]
+    names = [f'Country {i:06d}' for i in range(countries)]
+    years = sorted({period_year(col) for col in columns})
+
+    os.makedirs(os.path.join(root, 'reference'), exist_ok=True)
+    os.makedirs(os.path.join(root, 'data'), exist_ok=True)
+
+    pd.DataFrame({
+        'ISO3': codes,
+        'Country': names,
+        'Region': [f'Region {i % regions:02d}' for i in range(countries)],
+        'Aliases': [f'Alt {i:06d}' for i in range(countries)],
+    }).to_csv(os.path.join(root, 'countries.csv'), index=False)
+
+    # Transactions: base size x compound growth over the periods
+    base = rng.lognormal(mean=1.0, sigma=2.0, size=(countries, 1))
+    growth = rng.uniform(1.05, 1.25, size=(countries, 1)) ** (1 / max(len(columns) / len(years), 1))
+    values = np.round(base * growth ** np.arange(len(columns)), 2)
+    missing = rng.random(values.shape) < 0.01
+    df = pd.DataFrame(values, columns=columns).astype(object)
+    df[pd.DataFrame(missing, columns=columns)] = ''
+    df.insert(0, 'Country', names)
+    df['Latitude'] = np.round(rng.uniform(-60, 70, countries), 4)
+    df['Longitude'] = np.round(rng.uniform(-180, 180, countries), 4)
+    df.to_csv(os.path.join(root, 'data', pipeline.INPUT_FILE), index=False)
+
+    population = np.round(rng.uniform(0.1, 1500, size=(countries, 1))
+                          * rng.uniform(1.0, 1.03, size=(countries, 1)) ** np.arange(len(years)), 2)
+    gdp = np.round(base * rng.uniform(0.5, 20, size=(countries, 1))
+                   * rng.uniform(1.0, 1.08, size=(countries, 1)) ** np.arange(len(years)), 2)
+    for stem, block in (('population', population), ('gdp', gdp)):
+        table = pd.DataFrame(block, columns=[str(year) for year in years])
+        table.insert(0, 'Country', names)
+        table.insert(0, 'ISO3', codes)
+        table.to_csv(os.path.join(root, 'reference', f'{stem}.csv'), index=False)
+
+
+class StageTimer:
+    """Wall time and tracemalloc peak of each stage."""
+
+    def __init__(self):
+        self.stages = {}
+
+    def run(self, name, function, *args, **kwargs):
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.stages[name] = {'seconds': round(seconds, 6), 'peak_bytes': peak}
+        return result
+
+
+def run_scale(scale, columns, regions, storage='csv', pages_dir=PAGES_DIR, keep=False):
+    """Generate one dataset and time every stage on it."""
+    countries = BASE_COUNTRIES * scale
+    root = tempfile.mkdtemp(prefix=f'tpa-bench-{scale}x-')
+    try:
+        generate_workspace(root, countries, regions, columns)
+        data_dir = os.path.join(root, 'data')
+        countries_file = os.path.join(root, 'countries.csv')
+        input_file = os.path.join(data_dir, pipeline.INPUT_FILE)
+        if storage != 'csv':
+            # Converted up front, like running columnar.py once before many builds
+            input_file = write_columnar(load_table(input_file).frame,
+                                        os.path.splitext(input_file)[0] + '.' + storage)
+        timer = StageTimer()
+
+        # load
+        table = timer.run('load', load_table, input_file)
+        years = [period_year(col) for col in table.columns]
+
+        # join
+        def join():
+            registry = CountryRegistry.load(countries_file)
+            codes, _ = registry.codes_for(table.index)
+            population = ReferenceStore.load(os.path.join(root, 'reference', 'population.csv'),
+                                             scale=REFERENCES['population'][1]).get(codes, years)
+            gdp = ReferenceStore.load(os.path.join(root, 'reference', 'gdp.csv'),
+                                      scale=REFERENCES['gdp'][1]).get(codes, years, fill='nearest')
+            return population, gdp
+        population, gdp = timer.run('join', join)
+
+        # compute
+        def compute():
+            with np.errstate(divide='ignore', invalid='ignore'):
+                gdp_percentage = np.round(table.values / gdp * 100, 2)
+            per_capita = per_capita_block(table.values, population)
+            styles = choropleth.metric_style(per_capita.T.tolist())
+            return {'absolute': table.values, 'per_capita': per_capita,
+                    'gdp_percentage': gdp_percentage}, styles
+        blocks, _ = timer.run('compute', compute)
+
+        # write
+        def write():
+            keep_rows = np.ones(len(table.index), dtype=bool)
+            for name, block in blocks.items():
+                pipeline.write_metric(table.frame, table.columns, block, keep_rows,
+                                      os.path.join(data_dir, pipeline.OUTPUT_FILES[name]))
+        timer.run('write', write)
+
+        # inject
+        pages = os.path.join(root, 'pages')
+        shutil.copytree(pages_dir, pages)
+
+        def inject():
+            asset_dir = os.path.join(root, 'static', 'data')
+            asset = export_data.build_asset(data_dir, countries_file,
+                                            os.path.join(root, 'cache', 'growth.json'))
+            _, stale = export_data.write_asset(asset, asset_dir)
+            changed = render_pages.render_all(pages, os.path.join(asset_dir, 'manifest.json'))
+            export_data.remove_stale(stale)
+            return changed
+        timer.run('inject', inject)
+
+        rows, cells = len(table.index), table.values.size
+        for stats in timer.stages.values():
+            seconds = max(stats['seconds'], 1e-9)
+            stats['rows_per_second'] = round(rows / seconds, 1)
+            stats['cells_per_second'] = round(cells / seconds, 1)
+
+        return {
+            'scale': scale,
+            'countries': rows,
+            'periods': len(table.columns),
+            'cells': cells,
+            'input_bytes': os.path.getsize(input_file),
+            'total_seconds': round(sum(s['seconds'] for s in timer.stages.values()), 6),
+            'stages': timer.stages,
+        }
+    finally:
+        if keep:
+            print(f"  (kept {root})")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def compare(results, baseline):
+    """Print per-stage time ratios against a previous results file."""
+    previous = {(r['scale'], r['periods']): r for r in baseline.get('results', [])}
+    print(f"\nCompared with {baseline.get('commit', 'unknown')[:12]} ({baseline.get('timestamp', '?')}):")
+    for result in results:
+        old = previous.get((result['scale'], result['periods']))
+        if old is None:
+            continue
+        ratios = []
+        for stage in STAGES:
+            if stage in old['stages'] and stage in result['stages']:
+                ratio = result['stages'][stage]['seconds'] / max(old['stages'][stage]['seconds'], 1e-9)
+                flag = ' ⚠' if ratio > 1.2 else ''
+                ratios.append(f"{stage} {ratio:.2f}x{flag}")
+        print(f"  {result['scale']}x: " + ', '.join(ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the pipeline on synthetic data.')
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help='Comma-separated multiples of the 144 sample countries (default: 10,100,1000)')
+    parser.add_argument('--periods', choices=['yearly', 'monthly'], default='yearly',
+                        help='One column per year or per month')
+    parser.add_argument('--first-year', type=int, default=FIRST_YEAR)
+    parser.add_argument('--last-year', type=int, default=LAST_YEAR)
+    parser.add_argument('--regions', type=int, default=DEFAULT_REGIONS)
+    parser.add_argument('--storage', choices=['csv', 'arrow', 'parquet'], default='csv',
+                        help='Format the load stage reads (arrow/parquet need pyarrow)')
+    parser.add_argument('--output', help='Results file (default: data/benchmarks/<timestamp>-<commit>.json)')
+    parser.add_argument('--compare', help='Previous results file to compare against')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated datasets')
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(',') if scale.strip()]
+    columns = period_names(args.first_year, args.last_year, args.periods)
+    commit, dirty = git_commit()
+    timestamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+    results = []
+    for scale in scales:
+        print(f"Benchmarking {scale}x ({BASE_COUNTRIES * scale:,} countries x {len(columns)} periods)...")
+        result = run_scale(scale, columns, args.regions, args.storage, keep=args.keep)
+        results.append(result)
+        for stage in STAGES:
+            stats = result['stages'][stage]
+            print(f"  {stage:<8} {stats['seconds']:>9.3f}s  {stats['rows_per_second']:>14,.0f} rows/s  "
+                  f"peak {stats['peak_bytes'] / 1e6:>8.1f} MB")
+
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': timestamp,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'config': {
+            'scales': scales,
+            'periods': args.periods,
+            'first_year': args.first_year,
+            'last_year': args.last_year,
+            'regions': args.regions,
+            'storage': args.storage,
+            'seed': SEED,
+        },
+        'results': results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{timestamp}-{(commit or 'nogit')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    print(f"\n✓ Results written to {os.path.relpath(output, PROJECT_ROOT)}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(results, json.load(f))
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+Build the deployable copy of the dashboard into dist/.
+Every file under pages/ and static/ is copied to the same path in dist/:
+
+- JS, CSS and HTML are minified, including inline <script> and <style>
+  blocks in the pages (comments and slot markers are dropped, whitespace
+  collapsed; code is never renamed or reordered)
+- JS, CSS and other static assets get a content hash in their filename
+  (charts.js -> charts.<hash>.js) and every reference to them in the
+  pages, stylesheets and scripts is rewritten to the hashed name, so they
+  can be cached as immutable (see serve.py). Pages keep their names, and
+  files that already carry a hash (the data assets from export_data.py)
+  are copied as they are
+- text files get .gz (and .br when the brotli package is installed)
+  siblings
+
+References are recognised in the form the pages use them:
+"../static/<path>", "/static/<path>" or "static/<path>".
+
+dist/asset-manifest.json maps each source path to its output, sizes and
+the content hashes it was built from. Builds are incremental: a file is
+only reprocessed when its own content, the hashed names of the files it
+references or this script changed, so editing one page rebuilds just
+that page. Outputs that are no longer produced are removed.
+
+Usage:
+    python3 scripts/build_assets.py                 # pages/ + static/ -> dist/
+    python3 scripts/build_assets.py --force         # rebuild everything
+    python3 scripts/build_assets.py --out /tmp/dist
+    python3 scripts/serve.py --root dist            # serve the result
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+from manifest import file_digest, sources_digest
+
+try:
+    import brotli
+except ImportError:  # optional: only needed for .br variants
+    brotli = None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+DIST_DIR = os.path.join(PROJECT_ROOT, 'dist')
+SOURCE_DIRS = ('pages', 'static')
+BUILD_MANIFEST = 'asset-manifest.json'
+MANIFEST_VERSION = 1
+
+HASH_LENGTH = 12
+# Same rule as serve.py: a hex run of 8+ characters before the extension
+HASHED_NAME = re.compile(r'\.[0-9a-f]{8,}\.[A-Za-z0-9]+$')
+# Precompressed siblings in the sources are regenerated, not copied
+SKIPPED_EXTENSIONS = ('.gz', '.br')
+# Entry points whose URLs must stay stable
+UNHASHED_EXTENSIONS = ('.html', '.json')
+COMPRESSIBLE_EXTENSIONS = ('.html', '.js', '.css', '.json', '.svg', '.txt', '.xml')
+MIN_COMPRESS_SIZE = 256
+
+REFERENCE = re.compile(r'(?<![\w.:/-])(?P<prefix>(?:\.\./)+|/)?(?P<path>static/[\w./-]+?\.[A-Za-z0-9]+)(?![\w./-])')
+
+JS_SPACE = re.compile(r'\s+')
+JS_WORD = re.compile(r'[\w$]+')
+WORD_CHAR = re.compile(r'[\w$\\]')
+# After these the next token must be an operand, so a '/' opens a regex
+REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+                  'void', 'throw', 'instanceof', 'yield', 'await'}
+# A line break next to these can never end a statement
+JOIN_AFTER = set('{;,([=:&|?*%<>!~^')
+JOIN_BEFORE = set('}]),;:?=&|')
+
+CSS_COMMENT_OR_STRING = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'', re.DOTALL)
+CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+
+HTML_TOKEN = re.compile(
+    r'<!--.*?-->'
+    r'|<(?P<raw>script|style|pre|textarea)\b[^>]*>.*?</(?P=raw)\s*>'
+    r'|<[^>]*>',
+    re.DOTALL | re.IGNORECASE,
+)
+HTML_RAW = re.compile(r'(<(script|style)\b[^>]*>)(.*?)(</\2\s*>)', re.DOTALL | re.IGNORECASE)
+SCRIPT_TYPE = re.compile(r'\btype\s*=\s*["\']?([^"\'\s>]+)', re.IGNORECASE)
+JS_TYPES = {'text/javascript', 'application/javascript', 'module'}
+
+
+class BuildError(ValueError):
+    """Raised when the sources cannot be built (e.g. circular references)."""
+
+
+def skip_string(source, i, quote):
+    """Index just past the string literal starting at source[i]."""
+    i += 1
+    while i < len(source):
+        c = source[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == quote or (c == '\n' and quote != '`'):
+            return i + 1
+        if quote == '`' and source.startswith('${', i):
+            i = _skip_code(source, i + 2)
+            continue
+        i += 1
+    return i
+
+
+def _skip_code(source, i):
+    """Index just past the '}' closing a template literal ${...} expression."""
+    depth = 1
+    while i < len(source):
+        c = source[i]
+        if c in '\'"`':
+            i = skip_string(source, i, c)
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _skip_regex(source, i):
+    """Index just past the regex literal (and its flags) starting at source[i]."""
+    i += 1
+    in_class = False
+    while i < len(source):
+        c = source[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '\n':
+            return i
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            i += 1
+            while i < len(source) and WORD_CHAR.match(source[i]):
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+def minify_js(source):
+    """
+    Drop comments and redundant whitespace from JavaScript.
+    Strings, template literals and regex literals are copied untouched and
+    a line break is kept wherever automatic semicolon insertion could
+    depend on it, so the result parses to the same program.
+    """
+    parts = []
+    last = ''           # last character written
+    gap = None          # whitespace skipped since then: None, ' ' or '\n'
+    i, n = 0, len(source)
+
+    while i < n:
+        c = source[i]
+        if c.isspace():
+            match = JS_SPACE.match(source, i)
+            if gap != '\n':
+                gap = '\n' if '\n' in match.group(0) else ' '
+            i = match.end()
+            continue
+        if source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end < 0 else end
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            comment = source[i:n if end < 0 else end + 2]
+            if gap != '\n':
+                gap = '\n' if '\n' in comment else (gap or ' ')
+            i += len(comment)
+            continue
+
+        if c in '\'"`':
+            end = skip_string(source, i, c)
+        elif c == '/' and (not last or last in REGEX_AFTER or (parts and parts[-1] in REGEX_KEYWORDS)):
+            end = _skip_regex(source, i)
+        elif JS_WORD.match(c):
+            end = JS_WORD.match(source, i).end()
+        else:
+            end = i + 1
+
+        if gap and last:
+            if gap == '\n' and not (last in JOIN_AFTER or c in JOIN_BEFORE):
+                parts.append('\n')
+            elif (WORD_CHAR.match(last) and WORD_CHAR.match(c)) or (last == c and c in '+-') \
+                    or (last == '/' and c in '/*'):
+                parts.append(' ')
+        parts.append(source[i:end])
+        last = source[end - 1]
+        gap = None
+        i = end
+
+    return ''.join(parts)
+
+
+def minify_css(source):
+    """Drop comments and redundant whitespace from CSS, leaving strings alone."""
+    parts = []
+    pending = []  # code since the last string, with comments removed
+    position = 0
+    for match in CSS_COMMENT_OR_STRING.finditer(source):
+        pending.append(source[position:match.start()])
+        if not match.group(0).startswith('/*'):
+            parts.extend([_squeeze_css(''.join(pending)), match.group(0)])
+            pending = []
+        position = match.end()
+    pending.append(source[position:])
+    parts.append(_squeeze_css(''.join(pending)))
+    return ''.join(parts).strip()
+
+
+def _squeeze_css(text):
+    text = re.sub(r'\s+', ' ', text)
+    text = CSS_PUNCTUATION.sub(r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    return text.replace(';}', '}')
+
+
+def _minify_raw(match):
+    """Minify the body of an inline <script> or <style> element."""
+    open_tag, tag, body, close_tag = match.groups()
+    if tag.lower() == 'style':
+        return open_tag + minify_css(body) + close_tag
+    script_type = SCRIPT_TYPE.search(open_tag)
+    if script_type and script_type.group(1).lower() not in JS_TYPES:
+        return open_tag + body.strip() + close_tag
+    return open_tag + minify_js(body) + close_tag
+
+
+def minify_html(source):
+    """
+    Drop comments and collapse whitespace between tags, and minify inline
+    scripts and styles. Tags themselves and <pre>/<textarea> contents are
+    copied untouched; runs of whitespace in text become one space (or one
+    line break), which renders the same.
+    """
+    parts = []
+    position = 0
+    for match in HTML_TOKEN.finditer(source):
+        parts.append(_squeeze_text(source[position:match.start()]))
+        token = match.group(0)
+        if token.startswith('<!--'):
+            if token.startswith('<!--[if'):
+                parts.append(token)
+        elif match.group('raw') and match.group('raw').lower() in ('script', 'style'):
+            parts.append(HTML_RAW.sub(_minify_raw, token, count=1))
+        else:
+            parts.append(token)
+        position = match.end()
+    parts.append(_squeeze_text(source[position:]))
+    return ''.join(parts).strip() + '\n'
+
+
+def _squeeze_text(text):
+    return re.sub(r'\s+', lambda m: '\n' if '\n' in m.group(0) else ' ', text)
+
+
+MINIFIERS = {
+    '.html': minify_html,
+    '.js': minify_js,
+    '.css': minify_css,
+}
+
+
+def source_files(root=PROJECT_ROOT, source_dirs=SOURCE_DIRS):
+    """Paths (relative to root, '/'-separated) of every file to build."""
+    found = []
+    for source_dir in source_dirs:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(root, source_dir)):
+            dirnames[:] = sorted(name for name in dirnames if not name.startswith('.'))
+            for filename in sorted(filenames):
+                if filename.startswith('.') or filename.endswith(SKIPPED_EXTENSIONS):
+                    continue
+                found.append(os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, '/'))
+    return found
+
+
+def references(text, known):
+    """The known source paths a file's text refers to, in order of first use."""
+    seen = []
+    for match in REFERENCE.finditer(text):
+        path = match.group('path')
+        if path in known and path not in seen:
+            seen.append(path)
+    return seen
+
+
+def rewrite_references(text, outputs):
+    """Point every reference to a built file at its output path."""
+    def replace(match):
+        output = outputs.get(match.group('path'))
+        return (match.group('prefix') or '') + output if output else match.group(0)
+    return REFERENCE.sub(replace, text)
+
+
+def build_order(graph):
+    """
+    Sources ordered so that every file comes after the files it references.
+    graph: {path: [referenced paths]}
+    """
+    order, state = [], {}
+
+    def visit(path, chain):
+        if state.get(path) == 'done':
+            return
+        if state.get(path) == 'visiting':
+            raise BuildError(f"circular reference: {' -> '.join(chain + [path])}")
+        state[path] = 'visiting'
+        for dependency in graph[path]:
+            visit(dependency, chain + [path])
+        state[path] = 'done'
+        order.append(path)
+
+    for path in graph:
+        visit(path, [])
+    return order
+
+
+def output_name(path, content):
+    """Output path for a source: with a content hash unless it is an entry point or already hashed."""
+    stem, extension = os.path.splitext(path)
+    if extension in UNHASHED_EXTENSIONS or HASHED_NAME.search(path):
+        return path
+    return f'{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}{extension}'
+
+
+def process(path, raw, outputs):
+    """Minified, reference-rewritten bytes of one source file."""
+    extension = os.path.splitext(path)[1]
+    if extension not in MINIFIERS:
+        return raw
+    text = rewrite_references(raw.decode('utf-8'), outputs)
+    return MINIFIERS[extension](text).encode('utf-8')
+
+
+def write_output(out_dir, output, content):
+    """
+    Write one output file with its precompressed siblings.
+    Returns: {"size", "gzip", "brotli"} byte counts (None when not written)
+    """
+    target = os.path.join(out_dir, *output.split('/'))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as f:
+        f.write(content)
+
+    sizes = {'size': len(content), 'gzip': None, 'brotli': None}
+    for extension in SKIPPED_EXTENSIONS:
+        if os.path.exists(target + extension):
+            os.remove(target + extension)
+    if not output.endswith(COMPRESSIBLE_EXTENSIONS) or len(content) < MIN_COMPRESS_SIZE:
+        return sizes
+
+    # mtime=0 keeps the gzip bytes identical between runs
+    compressed = gzip.compress(content, compresslevel=9, mtime=0)
+    with open(target + '.gz', 'wb') as f:
+        f.write(compressed)
+    sizes['gzip'] = len(compressed)
+    if brotli is not None:
+        compressed = brotli.compress(content, quality=11)
+        with open(target + '.br', 'wb') as f:
+            f.write(compressed)
+        sizes['brotli'] = len(compressed)
+    return sizes
+
+
+def load_build_manifest(out_dir):
+    """Entries of the last build, or {} when there is none (or it is from another version)."""
+    manifest_file = os.path.join(out_dir, BUILD_MANIFEST)
+    if not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data.get('files', {}) if data.get('version') == MANIFEST_VERSION else {}
+
+
+def build(root=PROJECT_ROOT, out_dir=DIST_DIR, force=False):
+    """
+    Build every source into out_dir.
+    Returns: (manifest entries {source path: entry}, list of rebuilt source paths,
+              list of removed output paths)
+    """
+    sources = source_files(root)
+    known = set(sources)
+    raw = {}
+    graph = {}
+    for path in sources:
+        with open(os.path.join(root, *path.split('/')), 'rb') as f:
+            raw[path] = f.read()
+        if os.path.splitext(path)[1] in MINIFIERS:
+            graph[path] = [ref for ref in references(raw[path].decode('utf-8'), known) if ref != path]
+        else:
+            graph[path] = []
+
+    previous = {} if force else load_build_manifest(out_dir)
+    code = sources_digest([__file__])
+    outputs, entries, rebuilt = {}, {}, []
+
+    for path in build_order(graph):
+        inputs = {
+            'source': hashlib.sha256(raw[path]).hexdigest(),
+            'references': {ref: outputs[ref] for ref in graph[path]},
+            'code': code,
+        }
+        entry = previous.get(path)
+        target = os.path.join(out_dir, *entry['output'].split('/')) if entry else None
+        if entry and entry.get('inputs') == inputs and file_digest(target) == entry.get('digest'):
+            entries[path] = entry
+        else:
+            content = process(path, raw[path], outputs)
+            output = output_name(path, content)
+            sizes = write_output(out_dir, output, content)
+            entries[path] = dict(output=output, digest=hashlib.sha256(content).hexdigest(),
+                                 source_size=len(raw[path]), inputs=inputs, **sizes)
+            rebuilt.append(path)
+        outputs[path] = entries[path]['output']
+
+    # Drop outputs of earlier builds that this one no longer produces
+    current = set(outputs.values())
+    removed = []
+    for entry in load_build_manifest(out_dir).values():
+        if entry['output'] not in current:
+            target = os.path.join(out_dir, *entry['output'].split('/'))
+            for stale in (target, target + '.gz', target + '.br'):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            removed.append(entry['output'])
+
+    with open(os.path.join(out_dir, BUILD_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'files': entries}, f, indent=2, sort_keys=True)
+        f.write('\n')
+    return entries, rebuilt, removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Minify, fingerprint and precompress pages/ and static/.')
+    parser.add_argument('--root', default=PROJECT_ROOT, help='Directory containing pages/ and static/')
+    parser.add_argument('--out', default=DIST_DIR, help='Output directory (default: dist/)')
+    parser.add_argument('--force', action='store_true', help='Rebuild every file')
+    parser.add_argument('--clean', action='store_true', help='Empty the output directory first')
+    args = parser.parse_args()
+
+    if args.clean and os.path.isdir(args.out):
+        shutil.rmtree(args.out)
+    os.makedirs(args.out, exist_ok=True)
+
+    try:
+        entries, rebuilt, removed = build(args.root, args.out, args.force)
+    except BuildError as e:
+        print(f"❌ {e}")
+        return False
+
+    for path in rebuilt:
+        entry = entries[path]
+        compressed = f", {entry['gzip']:,} gzipped" if entry['gzip'] else ''
+        print(f"✓ {path} -> {entry['output']} ({entry['source_size']:,} -> {entry['size']:,} bytes{compressed})")
+    for output in removed:
+        print(f"✓ Removed stale {output}")
+
+    source_total = sum(entry['source_size'] for entry in entries.values())
+    output_total = sum(entry['size'] for entry in entries.values())
+    gzip_total = sum(entry['gzip'] or entry['size'] for entry in entries.values())
+    print(f"✅ {len(entries)} files in {os.path.relpath(args.out)} ({len(rebuilt)} rebuilt): "
+          f"{source_total:,} -> {output_total:,} bytes, {gzip_total:,} compressed")
+    if brotli is None:
+        print("  (install 'brotli' to also write .br variants)")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
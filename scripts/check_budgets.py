@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Page-weight and request budgets for the dashboard pages.
+Parses every page in pages/ offline and reports, raw and compressed
+(gzip, plus brotli when the package is installed):
+
+- the HTML document itself
+- its inline <script> and <style> blocks
+- inline data literals: object/array literals assigned to a variable in
+  an inline script (e.g. `const paymentData = {...}`), largest first
+- each local file it loads (script src, stylesheet, images, and
+  "../static/..." URLs fetched from scripts)
+- the external origins it contacts (CDNs, Mapbox, Google Fonts,
+  raw.githubusercontent, ...) and the external resources it requests
+
+Each page is then checked against the budgets in data/budgets.json: a
+"default" block applies to every page and "pages" overrides it per
+file. Budgets are on compressed bytes where transfer size is what
+matters; external resources count towards requests but not bytes, as
+their size is not known offline. Any page over budget fails the run.
+
+The full report is written as JSON for trend tracking, tagged with the
+git commit like the benchmark results.
+
+Usage:
+    python3 scripts/check_budgets.py                    # check pages/
+    python3 scripts/check_budgets.py --root dist        # check the build from build_assets.py
+    python3 scripts/check_budgets.py --output weight.json --quiet
+"""
+
+import argparse
+import datetime
+import gzip
+import json
+import os
+import posixpath
+import re
+import sys
+import urllib.parse
+
+from benchmark import git_commit
+from build_assets import HTML_RAW, REFERENCE, skip_string
+
+try:
+    import brotli
+except ImportError:  # optional: only needed for brotli sizes
+    brotli = None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+BUDGETS_FILE = os.path.join(PROJECT_ROOT, 'data', 'budgets.json')
+RESULTS_DIR = os.path.join(PROJECT_ROOT, 'data', 'page-weight')
+
+# Budgeted metrics, as "name": description
+METRICS = {
+    'html_gzip': 'HTML document, gzipped',
+    'inline_script_gzip': 'inline scripts, gzipped',
+    'inline_data_bytes': 'inline data literals, raw',
+    'asset_gzip': 'local assets, gzipped',
+    'total_gzip': 'HTML + local assets, gzipped',
+    'requests': 'requests (document, local assets, external resources)',
+    'external_origins': 'external origins contacted',
+}
+
+MIN_LITERAL_BYTES = 256
+
+RESOURCE_TAG = re.compile(r'<(script|link|img|iframe|source|video|audio|embed)\b([^>]*)>', re.IGNORECASE)
+ATTRIBUTE = re.compile(r'([\w-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))')
+URL_ATTRIBUTES = ('src', 'href')
+# <link rel=...> values that make the browser contact an origin without fetching a resource
+CONNECT_ONLY_RELS = {'preconnect', 'dns-prefetch'}
+# <link rel=...> values that are not fetched at all
+IGNORED_RELS = {'canonical', 'alternate', 'author', 'license', 'help', 'search', 'next', 'prev'}
+EXTERNAL_URL = re.compile(r'(?:https?:)?//', re.IGNORECASE)
+URL_LITERAL = re.compile(r'([\'"`])((?:https?:)?//[^\'"`\s<>]+)\1')
+DATA_LITERAL = re.compile(r'(?:\b(?:const|let|var)\s+|\bwindow\.)([\w$]+)\s*=\s*([\[{])')
+
+# Origins a resource pulls in by itself, beyond its own
+IMPLIED_ORIGINS = {
+    'https://fonts.googleapis.com': ['https://fonts.gstatic.com'],  # the font files
+    'https://api.mapbox.com': ['https://events.mapbox.com'],        # mapbox-gl telemetry
+}
+
+
+def sizes(content):
+    """{"bytes", "gzip", "brotli"} for a bytes or str payload (brotli None without the package)."""
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return {
+        'bytes': len(content),
+        'gzip': len(gzip.compress(content, compresslevel=9, mtime=0)),
+        'brotli': len(brotli.compress(content, quality=11)) if brotli is not None else None,
+    }
+
+
+def attributes(tag_body):
+    """{name: value} of an HTML tag's attributes (names lower-cased)."""
+    return {name.lower(): ''.join(values) for name, *values in ATTRIBUTE.findall(tag_body)}
+
+
+def origin(url):
+    """scheme://host of an absolute or protocol-relative URL."""
+    parts = urllib.parse.urlsplit(url if '://' in url else 'https:' + url)
+    return f'{parts.scheme}://{parts.netloc}'.lower()
+
+
+def literal_end(source, i):
+    """Index just past the bracketed literal opening at source[i]."""
+    depth = 0
+    while i < len(source):
+        c = source[i]
+        if c in '\'"`':
+            i = skip_string(source, i, c)
+            continue
+        if c in '[{(':
+            depth += 1
+        elif c in ']})':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def data_literals(script):
+    """[(name, literal text)] of the object/array literals assigned in a script."""
+    found = []
+    position = 0
+    while True:
+        match = DATA_LITERAL.search(script, position)
+        if match is None:
+            return found
+        end = literal_end(script, match.start(2))
+        found.append((match.group(1), script[match.start(2):end]))
+        position = end
+
+
+def page_resources(html):
+    """
+    What a page loads.
+    Returns: (local URLs, external URLs, connect-only external URLs), each in order of first use
+    """
+    local, external, connect = [], [], []
+
+    def add(url, target):
+        if url not in target:
+            target.append(url)
+
+    for tag, body in RESOURCE_TAG.findall(html):
+        attrs = attributes(body)
+        rels = set(attrs.get('rel', '').lower().split())
+        if tag.lower() == 'link' and rels & IGNORED_RELS:
+            continue
+        for name in URL_ATTRIBUTES:
+            url = attrs.get(name, '').strip()
+            if not url or url.startswith(('#', 'data:', 'mailto:', 'javascript:')):
+                continue
+            if EXTERNAL_URL.match(url):
+                add(url, connect if rels & CONNECT_ONLY_RELS else external)
+            else:
+                add(url, local)
+
+    for match in HTML_RAW.finditer(html):
+        if match.group(2).lower() != 'script':
+            continue
+        for literal in URL_LITERAL.finditer(match.group(3)):
+            add(literal.group(2), external)
+        for reference in REFERENCE.finditer(match.group(3)):
+            add(reference.group(0), local)
+    return local, external, connect
+
+
+def resolve_local(url, page_path, root):
+    """Filesystem path of a URL used in a page, or None if it points outside root."""
+    path = urllib.parse.urlsplit(url).path
+    if path.startswith('/'):
+        relative = posixpath.normpath(path.lstrip('/'))
+    else:
+        relative = posixpath.normpath(posixpath.join(posixpath.dirname(page_path), path))
+    if relative.startswith('..'):
+        return None
+    return os.path.join(root, *relative.split('/'))
+
+
+def analyze_page(page_file, root):
+    """Weight, requests and origins of one page, with the metrics that budgets apply to."""
+    with open(page_file, 'r', encoding='utf-8') as f:
+        html = f.read()
+    page_path = os.path.relpath(page_file, root).replace(os.sep, '/')
+
+    scripts, styles, literals = [], [], []
+    for match in HTML_RAW.finditer(html):
+        body = match.group(3)
+        if not body.strip():
+            continue
+        if match.group(2).lower() == 'style':
+            styles.append(body)
+            continue
+        scripts.append(body)
+        for name, literal in data_literals(body):
+            if len(literal.encode('utf-8')) >= MIN_LITERAL_BYTES:
+                literals.append(dict(name=name, **sizes(literal)))
+    literals.sort(key=lambda literal: -literal['bytes'])
+
+    local, external, connect = page_resources(html)
+    assets = []
+    for url in local:
+        filepath = resolve_local(url, page_path, root)
+        if filepath is None or not os.path.isfile(filepath):
+            assets.append({'url': url, 'missing': True, 'bytes': 0, 'gzip': 0, 'brotli': None})
+            continue
+        with open(filepath, 'rb') as f:
+            assets.append(dict(url=url, missing=False, **sizes(f.read())))
+
+    origins = []
+    for url in external + connect:
+        for contacted in [origin(url)] + IMPLIED_ORIGINS.get(origin(url), []):
+            if contacted not in origins:
+                origins.append(contacted)
+
+    html_sizes = sizes(html)
+    asset_gzip = sum(asset['gzip'] for asset in assets)
+    inline_scripts = sizes(''.join(scripts))
+    metrics = {
+        'html_gzip': html_sizes['gzip'],
+        'inline_script_gzip': inline_scripts['gzip'] if scripts else 0,
+        'inline_data_bytes': sum(literal['bytes'] for literal in literals),
+        'asset_gzip': asset_gzip,
+        'total_gzip': html_sizes['gzip'] + asset_gzip,
+        'requests': 1 + len(assets) + len(external),
+        'external_origins': len(origins),
+    }
+    return {
+        'page': os.path.basename(page_file),
+        'html': html_sizes,
+        'inline_scripts': dict(count=len(scripts), **inline_scripts),
+        'inline_styles': dict(count=len(styles), **sizes(''.join(styles))),
+        'data_literals': literals,
+        'assets': assets,
+        'external_resources': external,
+        'external_origins': origins,
+        'metrics': metrics,
+    }
+
+
+def load_budgets(budgets_file=BUDGETS_FILE):
+    """{"default": {metric: limit}, "pages": {page: {metric: limit}}}; empty when there is no file."""
+    if not os.path.exists(budgets_file):
+        return {'default': {}, 'pages': {}}
+    with open(budgets_file, 'r', encoding='utf-8') as f:
+        budgets = json.load(f)
+    for limits in [budgets.get('default', {})] + list(budgets.get('pages', {}).values()):
+        unknown = set(limits) - set(METRICS)
+        if unknown:
+            raise ValueError(f"{budgets_file}: unknown budget metric(s) {', '.join(sorted(unknown))}")
+    return {'default': budgets.get('default', {}), 'pages': budgets.get('pages', {})}
+
+
+def check_page(report, budgets):
+    """
+    Compare a page report with its budgets (default merged with the page's overrides).
+    Returns: (budgets applied, [{"metric", "value", "budget"}] over budget)
+    """
+    limits = dict(budgets['default'], **budgets['pages'].get(report['page'], {}))
+    over = [{'metric': metric, 'value': report['metrics'][metric], 'budget': limit}
+            for metric, limit in limits.items()
+            if limit is not None and report['metrics'][metric] > limit]
+    return limits, over
+
+
+def print_page(report, verbose):
+    metrics = report['metrics']
+    print(f"{report['page']}")
+    print(f"  HTML {report['html']['bytes']:,} bytes, {report['html']['gzip']:,} gzipped; "
+          f"{report['inline_scripts']['count']} inline scripts {report['inline_scripts']['gzip']:,} gzipped, "
+          f"{report['inline_styles']['count']} inline styles {report['inline_styles']['gzip']:,} gzipped")
+    if verbose:
+        for literal in report['data_literals']:
+            print(f"    data {literal['name']}: {literal['bytes']:,} bytes, {literal['gzip']:,} gzipped")
+        for asset in report['assets']:
+            state = 'missing' if asset['missing'] else f"{asset['bytes']:,} bytes, {asset['gzip']:,} gzipped"
+            print(f"    asset {asset['url']}: {state}")
+        for url in report['external_resources']:
+            print(f"    external {url}")
+    print(f"  total {metrics['total_gzip']:,} bytes gzipped, {metrics['requests']} requests, "
+          f"{metrics['external_origins']} external origins ({', '.join(report['external_origins']) or 'none'})")
+    for asset in report['assets']:
+        if asset['missing']:
+            print(f"  ⚠ {asset['url']} does not exist")
+    for violation in report['over_budget']:
+        print(f"  ❌ {METRICS[violation['metric']]}: {violation['value']:,} > budget {violation['budget']:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check page weight and request counts against budgets.')
+    parser.add_argument('--root', default=PROJECT_ROOT, help='Directory containing pages/ (and static/)')
+    parser.add_argument('--budgets', default=BUDGETS_FILE, help='Budgets file (default: data/budgets.json)')
+    parser.add_argument('--output', help='Report file (default: data/page-weight/<timestamp>-<commit>.json)')
+    parser.add_argument('--verbose', action='store_true', help='List every data literal, asset and external resource')
+    parser.add_argument('--quiet', action='store_true', help='Only print pages that are over budget')
+    args = parser.parse_args()
+
+    try:
+        budgets = load_budgets(args.budgets)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+
+    pages_dir = os.path.join(args.root, 'pages')
+    reports = []
+    for filename in sorted(os.listdir(pages_dir)):
+        if not filename.endswith('.html'):
+            continue
+        report = analyze_page(os.path.join(pages_dir, filename), args.root)
+        report['budgets'], report['over_budget'] = check_page(report, budgets)
+        reports.append(report)
+        if not args.quiet or report['over_budget']:
+            print_page(report, args.verbose)
+
+    commit, dirty = git_commit()
+    timestamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    output = args.output or os.path.join(RESULTS_DIR, f"{timestamp}-{(commit or 'nogit')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'commit': commit,
+            'dirty': dirty,
+            'timestamp': timestamp,
+            'root': os.path.relpath(os.path.abspath(args.root), PROJECT_ROOT),
+            'pages': reports,
+        }, f, indent=2)
+        f.write('\n')
+
+    failed = [report['page'] for report in reports if report['over_budget']]
+    if failed:
+        print(f"❌ {len(failed)} of {len(reports)} pages over budget: {', '.join(failed)}")
+    else:
+        print(f"✅ {len(reports)} pages within budget")
+    print(f"✓ Report written to {os.path.relpath(output)}")
+    return not failed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Build-time styling for the map page.
+Computes the choropleth colour, rank and percentile of every country for
+every year, plus the legend bounds, so the page only looks them up.
+The colour scale matches the one the page used to compute in the browser:
+a log scale over the year's min/max mapped onto the teal colour stops.
+"""
+
+import numpy as np
+import pandas as pd
+
+# (position, colour) along the normalized log scale
+COLOR_STOPS = [
+    (0.0, '#004F47'),   # Very dark teal (low values)
+    (0.33, '#006B5F'),  # Dark teal (low-medium)
+    (0.67, '#00A896'),  # Medium teal (medium-high)
+    (0.85, '#01D6B0'),  # Bright teal (high values)
+    (1.0, '#01F0C7'),   # Pale bright teal (top values)
+]
+NO_DATA_COLOR = '#4A5668'
+
+# Values below this are clamped before taking the log
+LOG_FLOOR = 0.1
+
+
+def _stop_channels():
+    positions = np.array([pos for pos, _ in COLOR_STOPS])
+    rgb = np.array([[int(color[i:i + 2], 16) for i in (1, 3, 5)] for _, color in COLOR_STOPS], dtype=float)
+    return positions, rgb
+
+
+def scale_colors(values, vmin, vmax):
+    """
+    Colours for an array of values on the log scale between vmin and vmax.
+    NaN values get NO_DATA_COLOR.
+    """
+    values = np.asarray(values, dtype=float)
+    colors = np.full(values.shape, NO_DATA_COLOR, dtype=object)
+    valid = np.isfinite(values)
+    if not valid.any():
+        return colors
+    if vmax == vmin:
+        colors[valid] = COLOR_STOPS[-1][1]
+        return colors
+
+    positions, rgb = _stop_channels()
+    log_min = np.log(max(vmin, LOG_FLOOR))
+    log_max = np.log(vmax)
+    normalized = np.clip((np.log(np.maximum(values[valid], LOG_FLOOR)) - log_min) / (log_max - log_min), 0, 1)
+
+    # Segment whose [start, end] holds the value; a value on a stop belongs
+    # to the segment ending there
+    segment = np.clip(np.searchsorted(positions, normalized, side='left') - 1, 0, len(positions) - 2)
+    factor = (normalized - positions[segment]) / (positions[segment + 1] - positions[segment])
+    channels = rgb[segment] * (1 - factor)[:, None] + rgb[segment + 1] * factor[:, None]
+    channels = np.floor(channels + 0.5).astype(int)  # round half up
+
+    colors[valid] = ['#%02X%02X%02X' % tuple(c) for c in channels]
+    return colors
+
+
+def year_style(values):
+    """
+    Style one year of a metric (one value per country).
+    Rank 1 is the largest value; ties keep country order. The percentile is
+    the share of countries with a value at or below this one.
+    Returns: (colours, ranks, percentiles, legend)
+    """
+    series = pd.Series(np.asarray(values, dtype=float))
+    valid = series.notna()
+    count = int(valid.sum())
+    if count == 0:
+        empty = [None] * len(series)
+        return [NO_DATA_COLOR] * len(series), empty, empty, {'min': None, 'max': None, 'count': 0}
+
+    vmin = float(series[valid].min())
+    vmax = float(max(series[valid].max(), 0))
+    colors = scale_colors(series.to_numpy(), vmin, vmax)
+    ranks = series.rank(method='first', ascending=False)
+    percentiles = (series.rank(method='max', pct=True) * 100).round(1)
+
+    def to_list(s, cast):
+        return [cast(v) if ok else None for v, ok in zip(s, valid)]
+
+    return (colors.tolist(), to_list(ranks, int), to_list(percentiles, float),
+            {'min': vmin, 'max': vmax, 'count': count})
+
+
+def metric_style(columns):
+    """
+    Style every year of a metric given as [[value per country] per year]
+    (None for missing).
+    Returns: {"colors", "ranks", "percentiles": [[per country] per year], "legend": [per year]}
+    """
+    style = {'colors': [], 'ranks': [], 'percentiles': [], 'legend': []}
+    for column in columns:
+        values = [np.nan if v is None else v for v in column]
+        colors, ranks, percentiles, legend = year_style(values)
+        style['colors'].append(colors)
+        style['ranks'].append(ranks)
+        style['percentiles'].append(percentiles)
+        style['legend'].append(legend)
+    return style
+
+
+def build_styles(metrics):
+    """Styles for every metric in an asset's "metrics" block."""
+    return {
+        'colorStops': [[pos, color] for pos, color in COLOR_STOPS],
+        'noDataColor': NO_DATA_COLOR,
+        'metrics': {name: metric_style(columns) for name, columns in metrics.items()},
+    }
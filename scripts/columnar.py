@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Convert the country-by-period CSVs in data/ to columnar storage.
+Each CSV gets an Arrow (.arrow, default) or Parquet (.parquet) sibling with
+float64 period columns. Once a columnar copy exists and is not older than
+its CSV, the pipeline, exporter and reference loader read it instead of
+the CSV (see tables.table_path): Arrow files are memory-mapped and need
+no parsing, Parquet files are smaller on disk.
+CSV stays the export format; --to-csv writes the CSVs back from the
+columnar copies.
+
+Requires the pyarrow package.
+
+Usage:
+    python3 scripts/columnar.py                     # data/*.csv -> data/*.arrow
+    python3 scripts/columnar.py --format parquet    # data/*.csv -> data/*.parquet
+    python3 scripts/columnar.py --reference         # also data/reference/*.csv
+    python3 scripts/columnar.py --to-csv            # data/*.arrow -> data/*.csv
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+from reference import REFERENCE_DIR, REFERENCE_KEY
+from tables import HAVE_PYARROW, KEY_COLUMN, load_table, write_columnar
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
+
+FORMATS = {'arrow': '.arrow', 'parquet': '.parquet'}
+
+
+def convert_dir(directory, extension, key=KEY_COLUMN):
+    """
+    Write a columnar copy of every country-by-period CSV in directory.
+    CSVs without the key column or period columns are skipped.
+    Returns: [(csv path, columnar path)]
+    """
+    converted = []
+    for csv_path in sorted(glob.glob(os.path.join(directory, '*.csv'))):
+        try:
+            table = load_table(csv_path, key=key)
+        except ValueError:
+            continue
+        target = os.path.splitext(csv_path)[0] + extension
+        converted.append((csv_path, write_columnar(table.frame, target, key=key)))
+    return converted
+
+
+def export_dir(directory, extension, key=KEY_COLUMN):
+    """
+    Write every columnar table in directory back out as CSV.
+    Returns: [(columnar path, csv path)]
+    """
+    exported = []
+    for path in sorted(glob.glob(os.path.join(directory, '*' + extension))):
+        csv_path = os.path.splitext(path)[0] + '.csv'
+        load_table(path, key=key).frame.to_csv(csv_path, index=False)
+        # Keep the columnar copy current: it now matches the CSV exactly
+        os.utime(path)
+        exported.append((path, csv_path))
+    return exported
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert the data/ CSVs to Arrow or Parquet.')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='arrow',
+                        help='Columnar format to write (default: arrow)')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='Directory with the report CSVs')
+    parser.add_argument('--reference', action='store_true',
+                        help=f'Also convert the reference tables in {os.path.relpath(REFERENCE_DIR, PROJECT_ROOT)}/')
+    parser.add_argument('--to-csv', action='store_true', help='Export the columnar files back to CSV')
+    args = parser.parse_args()
+
+    if not HAVE_PYARROW:
+        print("❌ pyarrow is not installed (pip install pyarrow)")
+        return False
+
+    extension = FORMATS[args.format]
+    targets = [(args.data_dir, KEY_COLUMN)]
+    if args.reference:
+        targets.append((REFERENCE_DIR, REFERENCE_KEY))
+
+    for directory, key in targets:
+        if args.to_csv:
+            for source, target in export_dir(directory, extension, key):
+                print(f"✓ {os.path.basename(source)} -> {os.path.basename(target)}")
+            continue
+        for source, target in convert_dir(directory, extension, key):
+            print(f"✓ {os.path.basename(source)} -> {os.path.basename(target)} "
+                  f"({os.path.getsize(source):,} -> {os.path.getsize(target):,} bytes)")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -4,65 +4,59 @@ Fast version: Convert payment transaction values to per capita.
 Downloads population data once in bulk, then performs calculations.
 """
 
+import argparse
+import csv
 import pandas as pd
 import requests
 import io
+import tempfile
+import zipfile
 from pathlib import Path
 import warnings
 
+from countries import load_countries, report_unmatched
+from instrument import add_instrument_arguments, instrumented, span, timed
+from percapita import compute_per_capita, population_frame
+from population_cache import (
+    POPULATION_INDICATOR, IndicatorCache, add_cache_arguments
+)
+
 warnings.filterwarnings('ignore')
 
 # Configuration
 INPUT_FILE = "Payments Trends Report 2025 - with coordinates.csv"
 OUTPUT_FILE = "Payments Trends Report 2025 - Per Capita.csv"
 YEARS = [2018, 2019, 2020, 2021, 2022, 2023, 2024, 2025]
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def read_population_csv(member):
+    """
+    Read only Country Code and the YEARS columns from a World Bank indicator CSV.
+    The file starts with a few metadata lines before the real header row.
+    """
+    text = io.TextIOWrapper(member, encoding='utf-8-sig')
+
+    for line in text:
+        if line.startswith('"Country Name"'):
+            header = next(csv.reader([line]))
+            break
+    else:
+        raise ValueError("No header row found in population CSV")
 
-# Country name mapping to World Bank country codes
-COUNTRY_CODES = {
-    "Argentina": "ARG", "Armenia": "ARM", "Australia": "AUS", "Austria": "AUT",
-    "Azerbaijan": "AZE", "Bahrain": "BHR", "Bangladesh": "BGD", "Belarus": "BLR",
-    "Belgium": "BEL", "Belize": "BLZ", "Benin": "BEN", "Bhutan": "BTN",
-    "Bolivia": "BOL", "Bosnia and Herzegovina": "BIH", "Botswana": "BWA", "Brazil": "BRA",
-    "Brunei Darussalam": "BRN", "Bulgaria": "BGR", "Burkina Faso": "BFA", "Burundi": "BDI",
-    "Cambodia": "KHM", "Cameroon": "CMR", "Canada": "CAN", "Chad": "TCD",
-    "Chile": "CHL", "China": "CHN", "Costa Rica": "CRI", "Croatia": "HRV",
-    "Cuba": "CUB", "Cyprus": "CYP", "Czechia": "CZE", "Denmark": "DNK",
-    "Dominican Republic": "DOM", "Ecuador": "ECU", "Egypt": "EGY", "El Salvador": "SLV",
-    "Equatorial Guinea": "GNQ", "Estonia": "EST", "Ethiopia": "ETH", "Fiji": "FJI",
-    "Finland": "FIN", "France": "FRA", "Gabon": "GAB", "Gambia": "GMB",
-    "Germany": "DEU", "Ghana": "GHA", "Greece": "GRC", "Guatemala": "GTM",
-    "Guinea": "GIN", "Guyana": "GUY", "Haiti": "HTI", "Honduras": "HND",
-    "Hungary": "HUN", "Iceland": "ISL", "India": "IND", "Indonesia": "IDN",
-    "Iran": "IRN", "Iraq": "IRQ", "Ireland": "IRL", "Israel": "ISR",
-    "Italy": "ITA", "Ivory Coast": "CIV", "Jamaica": "JAM", "Japan": "JPN",
-    "Jordan": "JOR", "Kazakhstan": "KAZ", "Kenya": "KEN", "Kuwait": "KWT",
-    "Kyrgyzstan": "KGZ", "Laos": "LAO", "Latvia": "LVA", "Lebanon": "LBN",
-    "Lesotho": "LSO", "Lithuania": "LTU", "Luxembourg": "LUX", "Madagascar": "MDG",
-    "Malawi": "MWI", "Malaysia": "MYS", "Malta": "MLT", "Mauritius": "MUS",
-    "Mexico": "MEX", "Moldova": "MDA", "Mongolia": "MNG", "Montenegro": "MNE",
-    "Morocco": "MAR", "Mozambique": "MOZ", "Myanmar": "MMR", "Namibia": "NAM",
-    "Nepal": "NPL", "Netherlands": "NLD", "New Zealand": "NZL", "Nicaragua": "NIC",
-    "Niger": "NER", "Nigeria": "NGA", "North Macedonia": "MKD", "Norway": "NOR",
-    "Oman": "OMN", "Pakistan": "PAK", "Panama": "PAN", "Papua New Guinea": "PNG",
-    "Paraguay": "PRY", "Philippines": "PHL", "Poland": "POL", "Portugal": "PRT",
-    "Puerto Rico": "PRI", "Republic of the Congo": "COG", "Romania": "ROU", "Russia": "RUS",
-    "Rwanda": "RWA", "Saudi Arabia": "SAU", "Senegal": "SEN", "Serbia": "SRB",
-    "Seychelles": "SYC", "Sierra Leone": "SLE", "Singapore": "SGP", "Slovakia": "SVK",
-    "Slovenia": "SVN", "South Africa": "ZAF", "South Korea": "KOR", "Spain": "ESP",
-    "Sri Lanka": "LKA", "Sudan": "SDN", "Suriname": "SUR", "Sweden": "SWE",
-    "Switzerland": "CHE", "Taiwan": "TWN", "Tajikistan": "TJK", "Tanzania": "TZA",
-    "Thailand": "THA", "Timor-Leste": "TLS", "Togo": "TGO", "Tunisia": "TUN",
-    "Turkey": "TUR", "Turkmenistan": "TKM", "Uganda": "UGA", "Ukraine": "UKR",
-    "United Arab Emirates": "ARE", "United Kingdom": "GBR", "United States": "USA",
-    "Uruguay": "URY", "Uzbekistan": "UZB", "Vietnam": "VNM", "Zambia": "ZMB",
-    "Zimbabwe": "ZWE"
-}
+    year_cols = [str(year) for year in YEARS if str(year) in header]
+    dtypes = {'Country Code': str, **{col: 'float64' for col in year_cols}}
 
+    return pd.read_csv(text, header=None, names=header,
+                       usecols=['Country Code'] + year_cols, dtype=dtypes)
 
+
+@timed('fetch', rows=len)
 def download_population_data():
     """
     Download World Bank population data for all countries and years.
     Uses the bulk CSV download API which is much faster.
+    The ZIP is streamed to a temporary file and only the needed columns are parsed.
     """
     print("Downloading population data from World Bank...")
 
@@ -70,17 +64,19 @@ def download_population_data():
     url = "https://api.worldbank.org/v2/en/indicator/SP.POP.TOTL?downloadformat=csv"
 
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-
-        # The API returns a zip file, so we need to extract it
-        import zipfile
-        import io as io_module
+        with tempfile.TemporaryFile(suffix='.zip') as tmp:
+            with requests.get(url, timeout=30, stream=True) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    tmp.write(chunk)
+            tmp.seek(0)
+
+            # The API returns a zip file; read the data member straight from it
+            with zipfile.ZipFile(tmp) as zip_file:
+                csv_file = [f for f in zip_file.namelist() if f.endswith('.csv') and 'API_SP.POP.TOTL' in f][0]
+                with zip_file.open(csv_file) as member:
+                    df = read_population_csv(member)
 
-        zip_file = zipfile.ZipFile(io_module.BytesIO(response.content))
-        csv_file = [f for f in zip_file.namelist() if f.endswith('.csv') and 'API_SP.POP.TOTL' in f][0]
-
-        df = pd.read_csv(zip_file.open(csv_file))
         print(f"✅ Downloaded population data with {len(df)} countries")
         return df
 
@@ -89,37 +85,33 @@ def download_population_data():
         return None
 
 
+@timed('parse', rows=len)
 def parse_population_data(df_pop):
     """
     Parse World Bank population data into a dictionary.
     Returns: {country_code: {year: population}}
     """
     # World Bank CSV has format: Country Name, Country Code, Indicator Name, Indicator Code, then years as columns
-    pop_dict = {}
+    year_cols = [str(year) for year in YEARS if str(year) in df_pop.columns]
 
-    for idx, row in df_pop.iterrows():
-        country_code = row['Country Code']
-        if pd.isna(country_code):
-            continue
+    block = df_pop.dropna(subset=['Country Code']).set_index('Country Code')[year_cols]
+    block = block.apply(pd.to_numeric, errors='coerce')
+    block.columns = [int(col) for col in year_cols]
 
-        pop_dict[country_code] = {}
+    # Reshape to one (code, year) -> population entry per available value
+    stacked = block.stack().dropna()
 
-        for year in YEARS:
-            year_col = str(year)
-            if year_col in row:
-                try:
-                    pop = float(row[year_col])
-                    if not pd.isna(pop):
-                        pop_dict[country_code][year] = pop
-                except (ValueError, TypeError):
-                    pass
+    pop_dict = {country_code: {} for country_code in block.index}
+    for (country_code, year), pop in zip(stacked.index, stacked.to_numpy().tolist()):
+        pop_dict[country_code][year] = pop
 
     return pop_dict
 
 
-def main():
+def convert(args):
     """
-    Main execution function.
+    Load the transaction CSV, get population from the cache or the bulk
+    download and write the per capita CSV.
     """
     try:
         # Check if input file exists
@@ -128,67 +120,51 @@ def main():
             return
 
         print(f"Loading {INPUT_FILE}...")
-        df = pd.read_csv(INPUT_FILE)
+        with span('load') as stage:
+            df = pd.read_csv(INPUT_FILE)
+            stage.rows = len(df)
         print(f"✅ Loaded {len(df)} countries")
 
-        # Download population data
-        df_pop = download_population_data()
-        if df_pop is None:
-            return
-
-        # Parse population data
-        print("Parsing population data...")
-        pop_dict = parse_population_data(df_pop)
-        print(f"✅ Parsed population for {len(pop_dict)} country codes")
-
-        # Create per capita version
-        df_percapita = df.copy()
-
-        # Process each country
+        codes, unmatched = load_countries().codes_for(df["Country"])
+        report_unmatched(unmatched, INPUT_FILE)
+        country_codes = list(dict.fromkeys(codes.dropna()))
+
+        with IndicatorCache(args.cache, args.ttl_days) as cache:
+            pop_dict, missing = cache.get(POPULATION_INDICATOR, country_codes, YEARS,
+                                          ignore_ttl=args.offline)
+
+            if not missing:
+                print(f"✅ Loaded population for {len(pop_dict)} country codes from cache")
+            elif args.offline:
+                print(f"⚠️  Offline: {len(missing)} country-years are not cached")
+            else:
+                # Download population data
+                df_pop = download_population_data()
+                if df_pop is None:
+                    return
+
+                # Parse population data
+                print("Parsing population data...")
+                pop_dict = parse_population_data(df_pop)
+                print(f"✅ Parsed population for {len(pop_dict)} country codes")
+
+                # The bulk file covers every country, so cache all of it
+                cache.put_dict(POPULATION_INDICATOR, pop_dict, list(pop_dict), YEARS)
+
+        # Calculate per capita for all countries in one pass
         print(f"\nCalculating per capita values...")
-        success_count = 0
-        missing_pop = []
-
-        for idx, row in df.iterrows():
-            country = row["Country"]
-            country_code = COUNTRY_CODES.get(country)
-
-            if not country_code:
-                continue
-
-            country_pop = pop_dict.get(country_code, {})
-
-            if not country_pop:
-                missing_pop.append(country)
-                continue
-
-            success_count += 1
-
-            for year in YEARS:
-                year_col = str(year)
-
-                # Get transaction value
-                transaction_val = row[year_col]
-                if isinstance(transaction_val, str):
-                    transaction_val = float(transaction_val.replace(",", ""))
-
-                # Get population for this year
-                population = country_pop.get(year)
-
-                if population and transaction_val:
-                    # Transaction values are in billions
-                    per_capita = (transaction_val * 1_000_000_000) / population
-                    df_percapita.loc[idx, year_col] = round(per_capita, 2)
-                else:
-                    df_percapita.loc[idx, year_col] = None
-
-            # Progress indicator
-            if (idx + 1) % 20 == 0:
-                print(f"  Processed {idx + 1}/{len(df)} countries...")
+        with span('compute', rows=len(df)):
+            df_percapita, matched = compute_per_capita(
+                df, population_frame(pop_dict, YEARS), codes, YEARS
+            )
+        success_count = int(matched.sum())
+        has_code = codes.notna().to_numpy()
+        missing_pop = df.loc[has_code & ~matched, "Country"].tolist()
 
         # Save to CSV
         print(f"\nSaving to {OUTPUT_FILE}...")
-        df_percapita.to_csv(OUTPUT_FILE, index=False)
+        with span('write', rows=len(df_percapita)):
+            df_percapita.to_csv(OUTPUT_FILE, index=False)
 
         print(f"\n✅ Done! Per capita data saved to {OUTPUT_FILE}")
         print(f"\nSummary:")
@@ -209,5 +185,18 @@ def main():
         traceback.print_exc()
 
 
+def main():
+    """
+    Main execution function.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_cache_arguments(parser)
+    add_instrument_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumented(args, 'convert_to_percapita_fast'):
+        convert(args)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Country registry shared by every script and the page export.
+data/reference/countries.csv lists each country once with its ISO3 code,
+display name, region and other spellings (World Bank API names, Natural
+Earth ADMIN/NAME values, short forms such as "UAE"). All of them are
+folded into one alias -> ISO3 hash map when the registry is loaded, so
+joins happen on ISO3 codes instead of repeated string matching.
+"""
+
+import csv
+import functools
+import os
+import unicodedata
+
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+COUNTRIES_FILE = os.path.join(PROJECT_ROOT, 'data', 'reference', 'countries.csv')
+
+ALIAS_SEPARATOR = ';'
+
+
+def normalize_name(name):
+    """Case-, accent- and whitespace-insensitive form of a country name."""
+    text = unicodedata.normalize('NFKD', str(name))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.casefold().split())
+
+
+class CountryRegistry:
+    """
+    ISO3 codes with display names and regions, plus a hash map from every
+    known spelling (and the code itself) to the code.
+    """
+
+    def __init__(self, records):
+        self.codes = []
+        self.names = {}
+        self.regions = {}
+        self.position = {}
+        self._aliases = {}
+
+        for record in records:
+            code = record['ISO3'].strip().upper()
+            if code in self.position:
+                raise ValueError(f"Duplicate country code {code}")
+            self.position[code] = len(self.codes)
+            self.codes.append(code)
+            self.names[code] = record['Country'].strip()
+            self.regions[code] = record.get('Region', '').strip()
+
+            spellings = [code, record['Country']]
+            spellings += [a for a in record.get('Aliases', '').split(ALIAS_SEPARATOR) if a.strip()]
+            for spelling in spellings:
+                key = normalize_name(spelling)
+                if self._aliases.setdefault(key, code) != code:
+                    raise ValueError(f"'{spelling}' is used for both {self._aliases[key]} and {code}")
+
+    @classmethod
+    def load(cls, filepath=COUNTRIES_FILE):
+        with open(filepath, 'r', encoding='utf-8', newline='') as f:
+            return cls(list(csv.DictReader(f)))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, name):
+        return normalize_name(name) in self._aliases
+
+    def code(self, name):
+        """ISO3 code for a name, alias or code, or None if unknown."""
+        return self._aliases.get(normalize_name(name))
+
+    def codes_for(self, names):
+        """
+        ISO3 code for each name.
+        Returns: (pandas Series of codes with None where unmatched,
+                  list of distinct unmatched names in input order)
+        """
+        index = names.index if isinstance(names, pd.Series) else None
+        names = pd.Series(list(names), index=index, dtype=object)
+        # Resolve each distinct spelling once, then map the whole column
+        lookup = {name: self.code(name) for name in names.unique()}
+        codes = names.map(lookup)
+        unmatched = [name for name, code in lookup.items() if code is None]
+        return codes, unmatched
+
+
+@functools.lru_cache(maxsize=None)
+def load_countries(filepath=COUNTRIES_FILE):
+    """The registry, read once per process."""
+    return CountryRegistry.load(filepath)
+
+
+def report_unmatched(unmatched, source, limit=10):
+    """Print every country that did not resolve, in one message."""
+    if not unmatched:
+        return
+    shown = ', '.join(map(str, unmatched[:limit]))
+    more = f" (+{len(unmatched) - limit} more)" if len(unmatched) > limit else ""
+    print(f"⚠ {len(unmatched)} countries in {source} are not in "
+          f"{os.path.relpath(COUNTRIES_FILE, PROJECT_ROOT)}: {shown}{more}")
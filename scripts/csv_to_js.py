@@ -1,32 +1,34 @@
 #!/usr/bin/env python3
 """
-Convert the Per Capita CSV (now % of GDP) to JavaScript object format
+Convert the % of GDP CSV to JavaScript object format
 for inclusion in the HTML file
 """
 
-import csv
+import json
 import os
 
+from tables import load_table
+
 def main():
     # File paths
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
     data_dir = os.path.join(project_root, 'data')
 
-    input_file = os.path.join(data_dir, 'Payments Trends Report 2025 - Per Capita.csv')
+    input_file = os.path.join(data_dir, 'Payments Trends Report 2025 - Percent of GDP.csv')
     output_file = os.path.join(project_root, 'payment_data_percapita_js.txt')
 
     print("Converting CSV to JavaScript format...")
 
+    table = load_table(input_file)
     js_lines = []
-
-    with open(input_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            country = row['Country']
-            # Format the JavaScript object entry
-            js_line = f'        "{country}": {{ "2021": {row["2021"]}, "2022": {row["2022"]}, "2023": {row["2023"]}, "2024": {row["2024"]}, "2025": {row["2025"]} }},'
-            js_lines.append(js_line)
+    for country, row in zip(table.index, table.values.tolist()):
+        # Format the JavaScript object entry; every year column in the CSV is included
+        values = ', '.join(
+            f'"{col}": {"null" if value != value else json.dumps(value)}'
+            for col, value in zip(table.columns, row)
+        )
+        js_lines.append(f'        {json.dumps(country)}: {{ {values} }},')
 
     # Write to output file
     with open(output_file, 'w', encoding='utf-8') as f:
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Export the pipeline output as a compact, versioned data asset for the pages.
+Writes minified columnar JSON with a content hash in the filename, plus
+precompressed .gz (and .br when the brotli package is installed) siblings,
+and re-renders the pages so they load the new file. When the Natural Earth
+source file has been vendored into data/geo/, the simplified country
+geometry is rebuilt alongside it (see geometry.py).
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from countries import COUNTRIES_FILE, load_countries, report_unmatched
+import choropleth
+import geometry
+import growth
+import render_pages
+import sparklines
+from tables import load_table, table_path
+
+try:
+    import brotli
+except ImportError:  # optional: only needed for .br variants
+    brotli = None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
+ASSET_DIR = os.path.join(PROJECT_ROOT, 'static', 'data')
+
+ASSET_NAME = 'payments'
+ASSET_VERSION = 5
+
+# Metric name -> source CSV in data/
+METRIC_FILES = {
+    'absolute': 'Payments Trends Report 2025 - with coordinates.csv',
+    'per_capita': 'Payments Trends Report 2025 - Per Capita.csv',
+    'gdp_percentage': 'Payments Trends Report 2025 - Percent of GDP.csv',
+}
+
+
+def load_metric(filepath):
+    """
+    Load one metric CSV, or its Arrow/Parquet copy when that is current.
+    Returns: (list of countries, list of period columns, 2-D float array)
+    """
+    table = load_table(table_path(filepath), frame=False)
+    return table.index.tolist(), table.columns, table.values
+
+
+def load_metrics(data_dir=DATA_DIR, countries_file=COUNTRIES_FILE):
+    """
+    Load every available metric aligned on one sorted country list and one
+    period list; countries missing from a metric get NaN.
+    Returns: (countries, periods, ISO3 codes as a Series, {metric: float array})
+    """
+    loaded = {}
+    for name, filename in METRIC_FILES.items():
+        filepath = os.path.join(data_dir, filename)
+        if os.path.exists(filepath):
+            loaded[name] = load_metric(filepath)
+
+    countries = sorted(set().union(*(set(countries) for countries, _, _ in loaded.values())))
+    years = sorted(set().union(*(set(years) for _, years, _ in loaded.values())))
+    index = pd.Index(countries)
+    codes, unmatched = load_countries(countries_file).codes_for(countries)
+    report_unmatched(unmatched, 'the metric CSVs')
+
+    blocks = {}
+    for name, (metric_countries, metric_years, block) in loaded.items():
+        aligned = pd.DataFrame(block, index=metric_countries, columns=metric_years)
+        aligned = aligned[~aligned.index.duplicated()].reindex(index=index, columns=years)
+        blocks[name] = aligned.to_numpy()
+    return countries, years, codes, blocks
+
+
+def metric_growth(years, codes, blocks, countries_file=COUNTRIES_FILE, cache_file=growth.GROWTH_CACHE):
+    """Growth analytics of loaded metrics (see growth.py), from the cache when current."""
+    regions = load_countries(countries_file).regions
+    return growth.cached_growth(blocks, years, [regions.get(code) for code in codes], cache_file)
+
+
+def build_asset(data_dir=DATA_DIR, countries_file=COUNTRIES_FILE, growth_cache=growth.GROWTH_CACHE):
+    """
+    Assemble every available metric into one columnar structure:
+    {"version", "years", "countries", "codes", "metrics": {name: [[value per country] per year]},
+     "styles": {...}, "growth": {...}, "sparklines": {...}}
+    codes holds the ISO3 code of each country (null if it is not in the
+    registry), which the page uses to join map features. styles holds the
+    precomputed map colours, ranks, percentiles and legend bounds of each
+    metric (see choropleth.py), and growth the YoY, CAGR, rolling means and
+    regional/global aggregates (see growth.py). sparklines holds the
+    layout of each country's tooltip bar chart for the last few years:
+    a shared SVG frame and whole-pixel bar heights (see sparklines.py).
+    Countries missing from a metric get null.
+    """
+    countries, years, codes, blocks = load_metrics(data_dir, countries_file)
+    metrics = {
+        name: [[None if np.isnan(v) else v for v in column] for column in block.T.tolist()]
+        for name, block in blocks.items()
+    }
+
+    return {
+        'version': ASSET_VERSION,
+        'years': years,
+        'countries': countries,
+        'codes': codes.tolist(),
+        'metrics': metrics,
+        'styles': choropleth.build_styles(metrics),
+        'growth': metric_growth(years, codes, blocks, countries_file, growth_cache),
+        'sparklines': sparklines.build_sparklines(blocks, years),
+    }
+
+
+def write_asset(asset, asset_dir=ASSET_DIR, name=ASSET_NAME):
+    """
+    Write the asset as <name>.<hash>.json with .gz/.br siblings and update
+    manifest.json. Older versions are left in place, since the pages still
+    point at them until they are re-rendered: pass the returned list to
+    remove_stale() once render_pages has succeeded.
+    Returns: (the hashed filename, list of older version files)
+    """
+    payload = json.dumps(asset, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    digest = hashlib.sha256(payload).hexdigest()[:12]
+    filename = f'{name}.{digest}.json'
+    filepath = os.path.join(asset_dir, filename)
+
+    os.makedirs(asset_dir, exist_ok=True)
+    stale = [old for old in glob.glob(os.path.join(asset_dir, f'{name}.*.json*'))
+             if not os.path.basename(old).startswith(filename)]
+
+    if not os.path.exists(filepath):
+        with open(filepath, 'wb') as f:
+            f.write(payload)
+        # mtime=0 keeps the gzip bytes identical between runs
+        with open(filepath + '.gz', 'wb') as f:
+            f.write(gzip.compress(payload, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(filepath + '.br', 'wb') as f:
+                f.write(brotli.compress(payload, quality=11))
+
+    manifest_file = os.path.join(asset_dir, 'manifest.json')
+    manifest = {}
+    if os.path.exists(manifest_file):
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    manifest[name] = filename
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+    return filename, stale
+
+
+def remove_stale(stale):
+    """Delete asset versions that the rendered pages no longer reference."""
+    for old in stale:
+        if os.path.exists(old):
+            os.remove(old)
+
+
+def export_all(data_dir=DATA_DIR, asset_dir=ASSET_DIR, geometry_source=geometry.SOURCE_FILE):
+    """
+    Write every page asset (payment data, and geometry when its source is
+    present) and re-render the pages. Older asset versions are removed
+    only after every page has been rendered against the new ones.
+    Returns: ({asset name: hashed filename}, list of pages that changed)
+    """
+    asset = build_asset(data_dir)
+    written, stale = {}, []
+    written[ASSET_NAME], old = write_asset(asset, asset_dir)
+    stale += old
+    if os.path.exists(geometry_source):
+        collection = geometry.build_geometry(geometry_source, asset)
+        written[geometry.ASSET_NAME], old = write_asset(collection, asset_dir, geometry.ASSET_NAME)
+        stale += old
+    changed = render_pages.render_all(manifest_file=os.path.join(asset_dir, 'manifest.json'))
+    remove_stale(stale)
+    return written, changed
+
+
+def main():
+    print("Building page data assets...")
+    written, changed = export_all()
+
+    for filename in written.values():
+        size = os.path.getsize(os.path.join(ASSET_DIR, filename))
+        gz_size = os.path.getsize(os.path.join(ASSET_DIR, filename + '.gz'))
+        print(f"✓ Wrote static/data/{filename} ({size:,} bytes, {gz_size:,} gzipped)")
+    if geometry.ASSET_NAME not in written:
+        print(f"  (no {os.path.relpath(geometry.SOURCE_FILE, PROJECT_ROOT)}; the map keeps loading "
+              f"boundaries from GitHub - run geometry.py --fetch to vendor it)")
+    if brotli is None:
+        print("  (install 'brotli' to also write a .br variant)")
+
+    for page in changed:
+        print(f"✓ Updated {page}")
+
+
+if __name__ == "__main__":
+    main()
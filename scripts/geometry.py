@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Build the country boundaries used by the map page from a local copy of
+Natural Earth's ne_110m_admin_0_countries.geojson.
+
+Only the properties the page uses are kept (ISO3 code, name and the
+default view's value and colour, joined by ISO3). Each ring is simplified
+with Douglas-Peucker and its coordinates are quantized to a fixed number
+of decimals, and the result is written as a hashed static asset next to
+the payment data (see export_data.py), so the page no longer downloads
+the full source file from GitHub.
+
+Usage:
+    python3 scripts/geometry.py --fetch   # vendor the source file into data/geo/ once
+    python3 scripts/geometry.py           # rebuild the geometry asset and re-render pages
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import requests
+
+from countries import load_countries
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+SOURCE_FILE = os.path.join(PROJECT_ROOT, 'data', 'geo', 'ne_110m_admin_0_countries.geojson')
+SOURCE_URL = ('https://raw.githubusercontent.com/nvkelso/natural-earth-vector/master/'
+              'geojson/ne_110m_admin_0_countries.geojson')
+
+ASSET_NAME = 'countries'
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Simplification tolerance in degrees and decimals kept after quantizing
+# (0.01 degrees is roughly 1 km at the equator)
+DEFAULT_TOLERANCE = 0.02
+DEFAULT_PRECISION = 2
+
+# Metric and year whose value and colour are baked into each feature
+DEFAULT_METRIC = 'absolute'
+
+
+def fetch_source(url=SOURCE_URL, path=SOURCE_FILE):
+    """Download the source GeoJSON into data/geo/, streaming it to disk."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = path + '.part'
+    with requests.get(url, timeout=30, stream=True) as response:
+        response.raise_for_status()
+        with open(partial, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+    os.replace(partial, path)
+    return path
+
+
+def simplify_line(points, tolerance):
+    """
+    Douglas-Peucker simplification of an (n, 2) array of points.
+    The first and last points are always kept; for a closed ring (first
+    point == last point) distances are measured from that point.
+    """
+    n = len(points)
+    if n <= 4 or tolerance <= 0:
+        return points
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+
+    while stack:
+        start, end = stack.pop()
+        if end <= start + 1:
+            continue
+        a, b = points[start], points[end]
+        segment = points[start + 1:end]
+        direction = b - a
+        length = np.hypot(direction[0], direction[1])
+        if length == 0:
+            distances = np.hypot(segment[:, 0] - a[0], segment[:, 1] - a[1])
+        else:
+            distances = np.abs(direction[0] * (segment[:, 1] - a[1])
+                               - direction[1] * (segment[:, 0] - a[0])) / length
+
+        i = int(np.argmax(distances))
+        if distances[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    return points[keep]
+
+
+def quantize_ring(points, precision):
+    """Round a closed ring to `precision` decimals and drop repeated points."""
+    points = np.round(points, precision)
+    repeated = np.zeros(len(points), dtype=bool)
+    repeated[1:] = (points[1:] == points[:-1]).all(axis=1)
+    points = points[~repeated]
+    if len(points) and not (points[0] == points[-1]).all():
+        points = np.vstack([points, points[:1]])
+    return points
+
+
+def simplify_ring(ring, tolerance, precision):
+    """
+    Simplify and quantize one ring.
+    Small rings that would collapse keep their quantized original points;
+    rings too small to survive quantizing are dropped (None).
+    """
+    points = np.asarray(ring, dtype=float)[:, :2]
+    simplified = quantize_ring(simplify_line(points, tolerance), precision)
+    if len(simplified) < 4:
+        simplified = quantize_ring(points, precision)
+    if len(simplified) < 4:
+        return None
+    return simplified.tolist()
+
+
+def simplify_polygon(rings, tolerance, precision):
+    """A polygon's rings after simplifying; None if its exterior is gone."""
+    exterior = simplify_ring(rings[0], tolerance, precision)
+    if exterior is None:
+        return None
+    holes = [simplify_ring(ring, tolerance, precision) for ring in rings[1:]]
+    return [exterior] + [hole for hole in holes if hole is not None]
+
+
+def simplify_geometry(geometry, tolerance, precision):
+    """Simplified Polygon/MultiPolygon geometry, or None if nothing is left."""
+    if geometry is None:
+        return None
+    if geometry['type'] == 'Polygon':
+        polygons = [geometry['coordinates']]
+    elif geometry['type'] == 'MultiPolygon':
+        polygons = geometry['coordinates']
+    else:
+        return None
+
+    polygons = [p for p in (simplify_polygon(rings, tolerance, precision) for rings in polygons) if p]
+    if not polygons:
+        return None
+    if len(polygons) == 1:
+        return {'type': 'Polygon', 'coordinates': polygons[0]}
+    return {'type': 'MultiPolygon', 'coordinates': polygons}
+
+
+def feature_code(properties, registry):
+    """
+    ISO3 code of a Natural Earth feature.
+    ADM0_A3 is preferred because ISO_A3 is -99 for some countries (France,
+    Norway); names are resolved through the country registry as a fallback.
+    """
+    for key in ('ADM0_A3', 'ISO_A3', 'ISO_A3_EH'):
+        code = properties.get(key)
+        if code and code in registry.position:
+            return code
+    for key in ('ADMIN', 'NAME', 'NAME_LONG'):
+        code = registry.code(properties.get(key) or '')
+        if code:
+            return code
+    return properties.get('ADM0_A3') or properties.get('ISO_A3')
+
+
+def feature_values(asset, metric=DEFAULT_METRIC):
+    """
+    {ISO3: (value, colour)} for the latest year of a metric in the payment
+    data asset.
+    """
+    if not asset or metric not in asset.get('metrics', {}):
+        return {}
+    year = len(asset['years']) - 1
+    values = asset['metrics'][metric][year]
+    colors = asset['styles']['metrics'][metric]['colors'][year]
+    return {
+        code: (value, color)
+        for code, value, color in zip(asset['codes'], values, colors)
+        if code and value is not None
+    }
+
+
+def build_geometry(source_file=SOURCE_FILE, asset=None, tolerance=DEFAULT_TOLERANCE,
+                   precision=DEFAULT_PRECISION):
+    """
+    Read the source GeoJSON and return the slimmed FeatureCollection.
+    Every feature keeps ADM0_A3 (ISO3) and ADMIN (registry name when known),
+    plus value/color for the default view when the payment asset has them.
+    """
+    with open(source_file, 'r', encoding='utf-8') as f:
+        source = json.load(f)
+
+    registry = load_countries()
+    values = feature_values(asset)
+    no_data = asset['styles']['noDataColor'] if asset and 'styles' in asset else None
+
+    features = []
+    for feature in source.get('features', []):
+        geometry = simplify_geometry(feature.get('geometry'), tolerance, precision)
+        if geometry is None:
+            continue
+
+        properties = feature.get('properties') or {}
+        code = feature_code(properties, registry)
+        slim = {
+            'ADM0_A3': code,
+            'ADMIN': registry.names.get(code) or properties.get('ADMIN') or properties.get('NAME'),
+        }
+        if code in values:
+            slim['value'], slim['color'] = values[code]
+        elif no_data:
+            slim['value'], slim['color'] = 0, no_data
+
+        features.append({
+            'type': 'Feature',
+            'id': len(features),
+            'properties': slim,
+            'geometry': geometry,
+        })
+
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def geometry_stats(collection):
+    """(features, rings, points) in a FeatureCollection."""
+    rings = points = 0
+    for feature in collection['features']:
+        geometry = feature['geometry']
+        polygons = [geometry['coordinates']] if geometry['type'] == 'Polygon' else geometry['coordinates']
+        for polygon in polygons:
+            rings += len(polygon)
+            points += sum(len(ring) for ring in polygon)
+    return len(collection['features']), rings, points
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the simplified country geometry asset.')
+    parser.add_argument('--fetch', action='store_true',
+                        help='Download the Natural Earth source file into data/geo/ first')
+    parser.add_argument('--source', default=SOURCE_FILE, help='Source GeoJSON file')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'Simplification tolerance in degrees (default: {DEFAULT_TOLERANCE})')
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION,
+                        help=f'Decimals kept per coordinate (default: {DEFAULT_PRECISION})')
+    args = parser.parse_args()
+
+    if args.fetch:
+        print(f"Downloading {SOURCE_URL}...")
+        fetch_source(path=args.source)
+        print(f"✓ Saved {os.path.relpath(args.source, PROJECT_ROOT)}")
+
+    if not os.path.exists(args.source):
+        print(f"❌ {args.source} not found (run with --fetch to download it)")
+        return False
+
+    # Imported here: export_data builds the geometry as part of a full export
+    import export_data
+    import render_pages
+
+    collection = build_geometry(args.source, export_data.build_asset(), args.tolerance, args.precision)
+    _, _, source_points = geometry_stats(build_geometry(args.source, None, 0, 15))
+    features, rings, points = geometry_stats(collection)
+    filename, stale = export_data.write_asset(collection, name=ASSET_NAME)
+
+    size = os.path.getsize(os.path.join(export_data.ASSET_DIR, filename))
+    print(f"✓ {features} countries, {rings} rings, {points:,} points (source: {source_points:,})")
+    print(f"✓ Wrote static/data/{filename} ({size:,} bytes, "
+          f"source {os.path.getsize(args.source):,} bytes)")
+
+    for page in render_pages.render_all():
+        print(f"✓ Updated {page} to load {filename}")
+    export_data.remove_stale(stale)
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
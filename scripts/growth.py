@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Growth analytics over the country x period matrix of each metric.
+Everything is computed for all countries at once with NumPy array
+operations - no per-country loops - so adding a metric or a decade of
+history only makes the arrays bigger:
+
+- yoy: % change on the same period a year earlier
+- cagr: compound annual growth from each country's first to last value
+- trailing CAGR: compound annual growth over the last CAGR_WINDOW years
+- rolling: mean of the last ROLLING_WINDOW periods
+- regional and global aggregates of each metric, with their YoY and CAGR
+
+Ratio metrics (per capita, % of GDP) are aggregated as total transactions
+over total denominator, with each country's denominator recovered from its
+transaction value and ratio, so a region's per capita value is its total
+transactions per head rather than an average of its countries' ratios.
+
+Results are cached in data/cache/growth.json keyed by a hash of the
+inputs, and exported with the page data (see export_data.py), so the
+browser never derives them.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from manifest import object_digest, sources_digest
+from tables import period_year
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+GROWTH_CACHE = os.path.join(PROJECT_ROOT, 'data', 'cache', 'growth.json')
+
+ROLLING_WINDOW = 3  # periods
+CAGR_WINDOW = 3     # years
+DECIMALS = 2       # values (rolling means, aggregates)
+RATE_DECIMALS = 1  # growth rates in %
+
+# How each metric combines across countries: 'sum' for additive values,
+# 'ratio' for values that are transactions divided by something
+AGGREGATION = {
+    'absolute': 'sum',
+    'per_capita': 'ratio',
+    'gdp_percentage': 'ratio',
+}
+BASE_METRIC = 'absolute'
+
+
+def periods_per_year(periods):
+    """Number of columns per calendar year (1 for years, 4 for quarters, 12 for months)."""
+    years = [period_year(period) for period in periods]
+    return max(years.count(year) for year in set(years)) if years else 1
+
+
+def growth_rate(block, lag, years=1):
+    """
+    Compound % growth per year between each column and the one `lag`
+    columns earlier, spanning `years` years. Non-positive or missing
+    starting values give NaN, as do the first `lag` columns.
+    """
+    result = np.full(block.shape, np.nan)
+    if lag >= block.shape[1]:
+        return result
+    start, end = block[:, :-lag], block[:, lag:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = end / start
+        result[:, lag:] = np.where(start > 0, (np.power(ratio, 1 / years) - 1) * 100, np.nan)
+    return result
+
+
+def yoy(block, lag=1):
+    """% change on the same period one year (`lag` columns) earlier."""
+    return growth_rate(block, lag)
+
+
+def trailing_cagr(block, lag=1, window=CAGR_WINDOW):
+    """Compound annual growth over the `window` years ending at each column."""
+    return growth_rate(block, lag * window, window)
+
+
+def span_cagr(block, lag=1):
+    """
+    Compound annual growth of each row from its first to its last positive
+    value, as a % (NaN when there are fewer than two).
+    """
+    valid = np.isfinite(block) & (block > 0)
+    n = block.shape[1]
+    rows = np.arange(len(block))
+    first = valid.argmax(axis=1)
+    last = n - 1 - valid[:, ::-1].argmax(axis=1)
+    years = (last - first) / lag
+
+    result = np.full(len(block), np.nan)
+    ok = valid.any(axis=1) & (years > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = block[rows, last] / block[rows, first]
+        result[ok] = (np.power(ratio[ok], 1 / years[ok]) - 1) * 100
+    return result
+
+
+def rolling_mean(block, window=ROLLING_WINDOW):
+    """Mean of each column and the window - 1 before it (NaN until the window is full or has gaps)."""
+    result = np.full(block.shape, np.nan)
+    if window > block.shape[1]:
+        return result
+    windows = np.lib.stride_tricks.sliding_window_view(block, window, axis=1)
+    result[:, window - 1:] = windows.mean(axis=-1)
+    return result
+
+
+def group_sum(block, groups, count):
+    """
+    Sum rows into `count` groups (groups[i] is row i's group, -1 for none),
+    ignoring NaN. Groups with no values are NaN.
+    """
+    finite = np.isfinite(block)
+    member = groups >= 0
+    sums = np.zeros((count, block.shape[1]))
+    counts = np.zeros((count, block.shape[1]), dtype=int)
+    np.add.at(sums, groups[member], np.where(finite, block, 0)[member])
+    np.add.at(counts, groups[member], finite[member])
+    sums[counts == 0] = np.nan
+    return sums
+
+
+def aggregate(block, groups, count, how='sum', base=None):
+    """
+    Combine a metric across the countries of each group.
+    how='ratio' needs base (the transaction block): the result is
+    sum(base) / sum(base / ratio) over countries that have both.
+    """
+    if how == 'sum':
+        return group_sum(block, groups, count)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denominator = base / block
+    usable = np.isfinite(denominator) & (denominator != 0)
+    numerator = group_sum(np.where(usable, base, np.nan), groups, count)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return numerator / group_sum(np.where(usable, denominator, np.nan), groups, count)
+
+
+def to_columns(block, decimals=DECIMALS):
+    """[[value per row] per column] with None for NaN, the layout of the page asset."""
+    rounded = np.round(block, decimals)
+    return [[None if np.isnan(v) else v for v in column] for column in rounded.T.tolist()]
+
+
+def to_list(values, decimals=DECIMALS):
+    """[value per row] with None for NaN."""
+    return [None if np.isnan(v) else v for v in np.round(values, decimals).tolist()]
+
+
+def series_growth(block, lag):
+    """yoy, trailing CAGR and span CAGR of a block, in asset layout."""
+    return {
+        'yoy': to_columns(yoy(block, lag), RATE_DECIMALS),
+        'cagr': to_list(span_cagr(block, lag), RATE_DECIMALS),
+        'trailingCagr': to_columns(trailing_cagr(block, lag), RATE_DECIMALS),
+    }
+
+
+def build_growth(blocks, periods, regions):
+    """
+    Growth analytics for every metric.
+    blocks: {metric: float array (countries x periods)}, rows aligned with regions
+    regions: region name of each country (None or '' when unknown)
+    Returns: {"lag", "rollingWindow", "cagrWindow", "regions", "countryRegions",
+              "metrics": {metric: {"yoy", "cagr", "trailingCagr", "rolling"}},
+              "aggregates": {metric: {"regions": {"values", "yoy", "cagr", "trailingCagr"},
+                                      "global": {...}}}}
+    """
+    lag = periods_per_year(periods)
+    names = sorted({region for region in regions if region})
+    position = {region: i for i, region in enumerate(names)}
+    groups = np.array([position.get(region, -1) for region in regions], dtype=int)
+    everyone = np.zeros(len(regions), dtype=int)
+    base = blocks.get(BASE_METRIC)
+
+    metrics, aggregates = {}, {}
+    for name, block in blocks.items():
+        metrics[name] = dict(series_growth(block, lag), rolling=to_columns(rolling_mean(block)))
+
+        how = AGGREGATION.get(name, 'sum')
+        if how == 'ratio' and base is None:
+            continue
+        regional = aggregate(block, groups, len(names), how, base)
+        total = aggregate(block, everyone, 1, how, base)
+        aggregates[name] = {
+            'regions': dict(values=to_columns(regional), **series_growth(regional, lag)),
+            'global': {
+                'values': to_list(total[0]),
+                'yoy': to_list(yoy(total, lag)[0], RATE_DECIMALS),
+                'cagr': to_list(span_cagr(total, lag), RATE_DECIMALS)[0],
+                'trailingCagr': to_list(trailing_cagr(total, lag)[0], RATE_DECIMALS),
+            },
+        }
+
+    return {
+        'lag': lag,
+        'rollingWindow': ROLLING_WINDOW,
+        'cagrWindow': CAGR_WINDOW,
+        'regions': names,
+        'countryRegions': [position.get(region) for region in regions],
+        'metrics': metrics,
+        'aggregates': aggregates,
+    }
+
+
+def cached_growth(blocks, periods, regions, cache_file=GROWTH_CACHE):
+    """
+    build_growth, served from cache_file when the inputs and this module
+    are unchanged since it was written.
+    """
+    key = object_digest({
+        'blocks': {name: np.round(block, 6).tolist() for name, block in blocks.items()},
+        'periods': list(periods),
+        'regions': list(regions),
+        'code': sources_digest([__file__]),
+    })
+    if os.path.exists(cache_file):
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('key') == key:
+            return cached['growth']
+
+    growth = build_growth(blocks, periods, regions)
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    partial = cache_file + '.part'
+    with open(partial, 'w', encoding='utf-8') as f:
+        json.dump({'key': key, 'growth': growth}, f, separators=(',', ':'))
+    os.replace(partial, cache_file)
+    return growth
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Lightweight timing and memory instrumentation for the pipeline scripts.
+Wrap a stage in a span to record its wall time, CPU time, rows processed
+and tracemalloc peak; spans nest, and repeated spans with the same path
+are aggregated. At the end of a run the spans are written as a JSON
+report, so a slow rebuild can be read back without rerunning it under a
+profiler.
+
+    with span('load') as s:
+        table = load_table(path)
+        s.rows = len(table.index)
+
+    @timed('parse', rows=len)
+    def parse_population_data(df_pop): ...
+
+--profile additionally records the whole run: a .prof/.pstats path gets
+cProfile statistics (python3 -m pstats FILE), any other path gets
+collapsed stacks sampled from the main thread, one "a;b;c count" line per
+stack, ready for flamegraph.pl or speedscope.
+"""
+
+import cProfile
+import datetime
+import functools
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+PSTATS_EXTENSIONS = ('.prof', '.pstats')
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+
+
+class Span:
+    """One open span; set .rows to record how many rows it processed."""
+
+    def __init__(self, name, path, rows=None):
+        self.name = name
+        self.path = path
+        self.rows = rows
+        self.peak = 0
+        self.base = 0
+
+
+class Recorder:
+    """Aggregated spans of one run, keyed by their path."""
+
+    def __init__(self):
+        self.stats = {}
+        self.stack = []
+        self.started = time.time()
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+
+    def _absorb_peak(self):
+        # Fold the peak since the last reset into every open span, then reset
+        # it so the next span measures only its own allocations
+        if not tracemalloc.is_tracing():
+            return 0
+        current, peak = tracemalloc.get_traced_memory()
+        for open_span in self.stack:
+            open_span.peak = max(open_span.peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    @contextmanager
+    def span(self, name, rows=None):
+        path = '/'.join([s.name for s in self.stack] + [name])
+        current = self._absorb_peak()
+        opened = Span(name, path, rows)
+        opened.base = opened.peak = current
+        self.stack.append(opened)
+        self._entry(opened)  # listed in the order spans open, parents first
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield opened
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            self._absorb_peak()
+            self.stack.pop()
+            self._record(opened, wall, cpu)
+
+    def _entry(self, opened):
+        return self.stats.setdefault(opened.path, {
+            'name': opened.name,
+            'path': opened.path,
+            'depth': opened.path.count('/'),
+            'calls': 0,
+            'wall_seconds': 0.0,
+            'cpu_seconds': 0.0,
+            'rows': None,
+            'peak_bytes': None,
+        })
+
+    def _record(self, opened, wall, cpu):
+        stats = self._entry(opened)
+        stats['calls'] += 1
+        stats['wall_seconds'] += wall
+        stats['cpu_seconds'] += cpu
+        if opened.rows is not None:
+            stats['rows'] = (stats['rows'] or 0) + int(opened.rows)
+        if tracemalloc.is_tracing():
+            stats['peak_bytes'] = max(stats['peak_bytes'] or 0, opened.peak - opened.base)
+
+    def report(self, command=None):
+        """The run so far as a JSON-ready dict."""
+        spans = []
+        for stats in self.stats.values():
+            stats = dict(stats, wall_seconds=round(stats['wall_seconds'], 6),
+                         cpu_seconds=round(stats['cpu_seconds'], 6))
+            if stats['rows'] is not None and stats['wall_seconds'] > 0:
+                stats['rows_per_second'] = round(stats['rows'] / stats['wall_seconds'], 1)
+            spans.append(stats)
+
+        return {
+            'command': command or os.path.basename(sys.argv[0]),
+            'argv': sys.argv[1:],
+            'started': datetime.datetime.fromtimestamp(self.started, datetime.timezone.utc).isoformat(),
+            'wall_seconds': round(time.perf_counter() - self.wall_start, 6),
+            'cpu_seconds': round(time.process_time() - self.cpu_start, 6),
+            'traced_memory': tracemalloc.is_tracing(),
+            'python': platform.python_version(),
+            'spans': spans,
+        }
+
+
+RECORDER = Recorder()
+
+
+def span(name, rows=None):
+    """Context manager timing a stage on the shared recorder."""
+    return RECORDER.span(name, rows)
+
+
+def timed(name=None, rows=None):
+    """
+    Decorator form of span. rows, if given, is called with the return
+    value to count the rows processed (e.g. rows=len).
+    """
+    def decorate(function):
+        label = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(label) as opened:
+                result = function(*args, **kwargs)
+                if rows is not None and result is not None:
+                    opened.rows = rows(result)
+                return result
+        return wrapper
+    return decorate
+
+
+class StackSampler:
+    """Samples the main thread's stack on a background thread."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()
+        self.thread_id = threading.main_thread().ident
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profiling(path):
+    """Profile the enclosed block into path (pstats or collapsed stacks, see above)."""
+    if path is None:
+        yield
+        return
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.endswith(PSTATS_EXTENSIONS):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+    else:
+        sampler = StackSampler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            sampler.write(path)
+
+
+def write_report(path, command=None, recorder=None):
+    """Write the recorder's report as JSON to path."""
+    report = (recorder or RECORDER).report(command)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    return report
+
+
+def add_instrument_arguments(parser, report=None):
+    """
+    Add the shared --report / --profile / --trace-memory options to an
+    argparse parser. Instrumentation is opt-in: nothing is written and
+    tracemalloc stays off unless asked for. report is the path a bare
+    --report writes to (None: --report needs a path).
+    """
+    if report:
+        parser.add_argument('--report', nargs='?', const=report, metavar='FILE',
+                            help='Write per-stage timings as JSON to FILE '
+                                 f'(default: {os.path.relpath(report)})')
+    else:
+        parser.add_argument('--report', metavar='FILE',
+                            help='Write per-stage timings as JSON to this file')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='Also profile the run: .prof/.pstats for cProfile, '
+                             'anything else for collapsed stacks')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Record peak memory per stage with tracemalloc (slows the run down)')
+
+
+@contextmanager
+def instrumented(args, command=None):
+    """
+    Run the enclosed block under the options from add_instrument_arguments:
+    start tracemalloc, profile and write the report at the end (even when
+    the block fails), each only when asked for.
+    """
+    if args.trace_memory:
+        tracemalloc.start()
+    try:
+        with profiling(args.profile), span(command or os.path.basename(sys.argv[0])):
+            yield RECORDER
+    finally:
+        if args.report:
+            write_report(args.report, command)
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def print_report(report):
+    """Print a report's spans as an indented table."""
+    print(f"{'stage':<32} {'wall':>9} {'cpu':>9} {'rows':>10} {'peak MB':>9}")
+    for stats in report['spans']:
+        label = '  ' * stats['depth'] + stats['name']
+        rows = '' if stats['rows'] is None else f"{stats['rows']:,}"
+        peak = '' if stats['peak_bytes'] is None else f"{stats['peak_bytes'] / 1e6:.1f}"
+        print(f"{label:<32} {stats['wall_seconds']:>8.3f}s {stats['cpu_seconds']:>8.3f}s "
+              f"{rows:>10} {peak:>9}")
+
+
+def main():
+    """Print a saved report: python3 scripts/instrument.py data/.build-report.json"""
+    if len(sys.argv) != 2:
+        print(main.__doc__)
+        return False
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    print(f"{report['command']} {' '.join(report['argv'])} - started {report['started']}")
+    print_report(report)
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
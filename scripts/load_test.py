@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Load test for serve.py.
+Opens a number of concurrent keep-alive connections and requests the map
+page and its assets in a loop, the way repeated iframe embeds would, then
+reports throughput, latency percentiles, bytes on the wire and status
+codes. With --revalidate each client remembers the ETags it has seen and
+sends If-None-Match, so the run measures the 304 path a warm browser
+cache takes.
+
+By default a server is started in-process on a free port; pass --url to
+drive one that is already running.
+
+Usage:
+    python3 scripts/load_test.py                          # 8 clients for 10 s
+    python3 scripts/load_test.py --clients 32 --duration 30 --revalidate
+    python3 scripts/load_test.py --url http://127.0.0.1:8000 --output load.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from collections import Counter
+
+import numpy as np
+
+from render_pages import load_asset_manifest
+from serve import DashboardServer
+
+DEFAULT_CLIENTS = 8
+DEFAULT_DURATION = 10.0
+
+PAGE_PATHS = [
+    '/pages/global-reach-growth.html',
+    '/static/css/styles.css',
+    '/static/js/charts.js',
+    '/static/js/data.js',
+]
+
+
+def default_paths():
+    """The map page, shared static files and the current hashed data assets."""
+    assets = [f"/static/data/{filename}" for filename in load_asset_manifest().values()]
+    return PAGE_PATHS + assets
+
+
+class Client(threading.Thread):
+    """One keep-alive connection requesting paths round-robin until the deadline."""
+
+    def __init__(self, host, port, paths, deadline, encoding, revalidate):
+        super().__init__(daemon=True)
+        self.host, self.port = host, port
+        self.paths = paths
+        self.deadline = deadline
+        self.encoding = encoding
+        self.revalidate = revalidate
+        self.etags = {}
+        self.latencies = []
+        self.statuses = Counter()
+        self.bytes = 0
+        self.connections = 0
+        self.errors = 0
+
+    def connect(self):
+        self.connections += 1
+        return http.client.HTTPConnection(self.host, self.port, timeout=10)
+
+    def run(self):
+        connection = self.connect()
+        i = 0
+        while time.perf_counter() < self.deadline:
+            path = self.paths[i % len(self.paths)]
+            i += 1
+            headers = {'Accept-Encoding': self.encoding}
+            if self.revalidate and path in self.etags:
+                headers['If-None-Match'] = self.etags[path]
+
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                connection.close()
+                connection = self.connect()
+                continue
+            self.latencies.append(time.perf_counter() - start)
+            self.statuses[response.status] += 1
+            self.bytes += len(body)
+            if response.getheader('ETag'):
+                self.etags[path] = response.getheader('ETag')
+            if response.getheader('Connection', '').lower() == 'close':
+                connection.close()
+                connection = self.connect()
+        connection.close()
+
+
+def run_load(host, port, paths, clients, duration, encoding, revalidate):
+    """Drive the server and return a summary dict."""
+    deadline = time.perf_counter() + duration
+    threads = [Client(host, port, paths, deadline, encoding, revalidate) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array([latency for thread in threads for latency in thread.latencies])
+    statuses = sum((thread.statuses for thread in threads), Counter())
+    requests = len(latencies)
+    percentiles = np.percentile(latencies, [50, 95, 99]) * 1000 if requests else [float('nan')] * 3
+    return {
+        'clients': clients,
+        'duration_seconds': round(elapsed, 3),
+        'requests': requests,
+        'requests_per_second': round(requests / elapsed, 1),
+        'latency_ms': {
+            'p50': round(float(percentiles[0]), 3),
+            'p95': round(float(percentiles[1]), 3),
+            'p99': round(float(percentiles[2]), 3),
+            'max': round(float(latencies.max() * 1000), 3) if requests else None,
+        },
+        'bytes_received': sum(thread.bytes for thread in threads),
+        'connections': sum(thread.connections for thread in threads),
+        'errors': sum(thread.errors for thread in threads),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'accept_encoding': encoding,
+        'revalidate': revalidate,
+        'paths': paths,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the dashboard server.')
+    parser.add_argument('--url', help='Base URL of a running server (default: start one in-process)')
+    parser.add_argument('--clients', type=int, default=DEFAULT_CLIENTS,
+                        help=f'Concurrent keep-alive connections (default: {DEFAULT_CLIENTS})')
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION,
+                        help=f'Seconds to run (default: {DEFAULT_DURATION:g})')
+    parser.add_argument('--encoding', default='br, gzip', help="Accept-Encoding to send (default: 'br, gzip')")
+    parser.add_argument('--revalidate', action='store_true',
+                        help='Send If-None-Match with ETags already seen (warm browser cache)')
+    parser.add_argument('--path', action='append', dest='paths',
+                        help='Path to request (repeatable; default: the map page and its assets)')
+    parser.add_argument('--output', help='Also write the summary as JSON to this file')
+    args = parser.parse_args()
+
+    paths = args.paths or default_paths()
+    server = None
+    if args.url:
+        url = urllib.parse.urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        server = DashboardServer(('127.0.0.1', 0), quiet=True)
+        host, port = server.server_address[:2]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"Load testing http://{host}:{port} with {args.clients} clients for {args.duration:g}s...")
+    try:
+        summary = run_load(host, port, paths, args.clients, args.duration, args.encoding, args.revalidate)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    latency = summary['latency_ms']
+    print(f"✓ {summary['requests']:,} requests, {summary['requests_per_second']:,.0f} req/s "
+          f"over {summary['connections']} connections")
+    print(f"  latency p50 {latency['p50']:.2f} ms, p95 {latency['p95']:.2f} ms, p99 {latency['p99']:.2f} ms")
+    print(f"  {summary['bytes_received'] / summary['requests'] if summary['requests'] else 0:,.0f} bytes/request, "
+          f"statuses {summary['statuses']}")
+    if summary['errors']:
+        print(f"⚠ {summary['errors']} failed requests")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+            f.write('\n')
+        print(f"✓ Summary written to {args.output}")
+    return summary['errors'] == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
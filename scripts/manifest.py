@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Build manifest for incremental pipeline runs.
+Records content hashes of each stage's inputs (CSV, reference tables,
+script sources), its output file and one hash per input row, so a stage
+can be skipped when nothing changed or limited to the rows that did.
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+MANIFEST_FILE = os.path.join(PROJECT_ROOT, 'data', '.build-manifest.json')
+
+MANIFEST_VERSION = 1
+
+
+def file_digest(filepath):
+    """SHA-256 of a file's contents, or None if it does not exist."""
+    if not os.path.exists(filepath):
+        return None
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def object_digest(obj):
+    """SHA-256 of a JSON-serialisable object (dict keys sorted)."""
+    payload = json.dumps(obj, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def sources_digest(filepaths):
+    """Combined hash of several source files, used as a script version."""
+    return object_digest([file_digest(path) for path in sorted(filepaths)])
+
+
+def row_digests(df, key_column, columns):
+    """
+    One hash per row over the given columns, computed in a single vectorized pass.
+    Keys must be unique, since incremental runs match rows by key.
+    Returns: {key: hex digest}
+    """
+    duplicated = df[key_column][df[key_column].duplicated()]
+    if not duplicated.empty:
+        raise ValueError(f"Duplicate {key_column} values: {', '.join(map(str, duplicated.unique()[:10]))}")
+    hashes = pd.util.hash_pandas_object(df[columns], index=False)
+    return dict(zip(df[key_column], (format(h, '016x') for h in hashes.to_numpy())))
+
+
+class BuildManifest:
+    """
+    JSON manifest of stage inputs, outputs and row hashes from the last run.
+    """
+
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        self.stages = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.stages = data.get('stages', {})
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'stages': self.stages}, f, indent=2, sort_keys=True)
+
+    def is_fresh(self, stage, inputs, output_file):
+        """
+        True if the stage last ran with exactly these inputs and its output
+        file is still the one it wrote.
+        """
+        state = self.stages.get(stage)
+        return (
+            state is not None
+            and state.get('inputs') == inputs
+            and state.get('output') is not None
+            and state.get('output') == file_digest(output_file)
+        )
+
+    def changed_rows(self, stage, inputs, output_file, rows, ignore=('input',)):
+        """
+        Keys of rows that need recomputing.
+        Only the input-table hash may differ from the last run (and the
+        previous output must be intact); otherwise every row is returned.
+        """
+        state = self.stages.get(stage)
+        if state is None or state.get('output') != file_digest(output_file):
+            return set(rows)
+
+        previous = state.get('inputs', {})
+        for name, digest in inputs.items():
+            if name not in ignore and previous.get(name) != digest:
+                return set(rows)
+
+        previous_rows = state.get('rows', {})
+        return {key for key, digest in rows.items() if previous_rows.get(key) != digest}
+
+    def record(self, stage, inputs, output_file, rows=None):
+        """Remember the inputs, output hash and row hashes of a completed stage."""
+        self.stages[stage] = {
+            'inputs': inputs,
+            'output': file_digest(output_file),
+            'rows': rows or {},
+        }
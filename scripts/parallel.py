@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Helpers for running pipeline work across a process pool.
+Numeric blocks are handed to workers through multiprocessing.shared_memory
+instead of being pickled: the parent copies an array into a named block,
+tasks carry only the block's (name, shape, dtype), and workers read their
+input rows and write their output rows in place. Shards are contiguous
+row ranges and never overlap, so the merged result does not depend on
+which worker finished first.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedArray:
+    """
+    A NumPy array backed by a shared memory block.
+    The process that creates it owns it and unlinks it on exit from a with
+    block; workers attach by spec and only close their handle.
+    """
+
+    def __init__(self, shm, shape, dtype, owner):
+        self.shm = shm
+        self.owner = owner
+        self.array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    @classmethod
+    def copy_of(cls, array):
+        """A new shared block holding a copy of array."""
+        array = np.ascontiguousarray(array)
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        shared = cls(shm, array.shape, array.dtype, owner=True)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        """Open a block created in another process from its spec."""
+        name, shape, dtype = spec
+        return cls(shared_memory.SharedMemory(name=name), shape, np.dtype(dtype), owner=False)
+
+    @property
+    def spec(self):
+        """(name, shape, dtype) - all a worker needs to attach."""
+        return self.shm.name, self.array.shape, self.array.dtype.str
+
+    def close(self):
+        # The array view must go before the buffer can be released
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def shard_ranges(count, shards):
+    """
+    Split range(count) into at most `shards` contiguous (start, stop) ranges
+    of near-equal size, in order.
+    """
+    shards = max(1, min(shards, count))
+    bounds = np.linspace(0, count, shards + 1).round().astype(int)
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+
+def run_tasks(function, tasks, workers):
+    """
+    Run function over tasks on a pool of `workers` processes.
+    Returns the results in task order.
+    """
+    if not tasks:
+        return []
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return list(pool.map(function, tasks))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Shared per capita engine used by the convert_to_percapita scripts.
+Joins the transaction frame to a population frame once and divides the
+whole block of year columns as NumPy arrays instead of cell by cell.
+"""
+
+import numpy as np
+import pandas as pd
+
+from tables import numeric_block
+
+# Transaction values in the report are in billions USD
+TRANSACTION_SCALE = 1_000_000_000
+
+
+def population_frame(pop_dict, years):
+    """
+    Build a population frame from a {key: {year: population}} dictionary.
+    Returns a DataFrame indexed by key with one float column per year.
+    """
+    df_pop = pd.DataFrame.from_dict(pop_dict, orient="index")
+    return df_pop.reindex(columns=list(years)).astype(float)
+
+
+def compute_per_capita(df, df_pop, keys, years, population_scale=1):
+    """
+    Calculate per capita transaction values for every row at once.
+
+    df: transaction frame with one column per year ("2018", "2019", ...)
+    df_pop: population frame indexed by join key with one column per year
+    keys: join key for each row of df (country name or country code)
+    population_scale: multiplier turning df_pop values into people
+
+    Cells without a population or transaction value are left empty (None),
+    everything else is rounded to 2 decimal places.
+
+    Returns: (per capita DataFrame, boolean array of rows with population data)
+    """
+    year_cols = [str(year) for year in years]
+    values = numeric_block(df, year_cols)
+
+    # Single join: line every row up with its population row
+    populations = df_pop.reindex(index=pd.Index(keys), columns=list(years))
+    populations = populations.to_numpy(dtype=float) * population_scale
+
+    df_percapita = df.copy()
+    df_percapita[year_cols] = pd.DataFrame(
+        per_capita_block(values, populations), index=df.index, columns=year_cols
+    )
+
+    matched = np.isfinite(populations).any(axis=1)
+    return df_percapita, matched
+
+
+def per_capita_block(values, populations):
+    """
+    Divide a block of transaction values (billions USD) by an aligned block
+    of populations. Cells missing either side, or with a zero transaction
+    value, become NaN; the rest are rounded to 2 decimal places.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_capita = np.round(values * TRANSACTION_SCALE / populations, 2)
+
+    valid = (
+        np.isfinite(values) & (values != 0)
+        & np.isfinite(populations) & (populations != 0)
+    )
+    per_capita[~valid] = np.nan
+    return per_capita
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the payments data pipeline.
+Parses the transaction CSV once and derives every metric (absolute,
+per capita, % of GDP) from the same in-memory year block, writing one
+CSV per metric.
+
+Runs are incremental: a metric is skipped when its input CSV, reference
+data and script sources are unchanged, and only changed rows are
+recomputed when just the input table moved (see manifest.py).
+
+Usage:
+    python3 scripts/pipeline.py                     # all metrics
+    python3 scripts/pipeline.py --per-capita --gdp  # pick metrics
+    python3 scripts/pipeline.py --force             # ignore the manifest
+    python3 scripts/pipeline.py --export            # also rebuild the page data asset
+    python3 scripts/pipeline.py --export --dist     # ...and the minified build in dist/
+    python3 scripts/pipeline.py --report --trace-memory  # timings and memory per stage
+    python3 scripts/pipeline.py --profile run.prof  # also profile the run
+    python3 scripts/pipeline.py --workers 4         # shard countries across 4 processes
+    python3 scripts/pipeline.py --columnar arrow    # also write .arrow copies (see columnar.py)
+
+--report writes per-stage timings to data/.build-report.json, with peak
+memory when --trace-memory is also given (see instrument.py).
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+import build_assets
+from countries import COUNTRIES_FILE, load_countries, report_unmatched
+import export_data
+import growth
+from instrument import add_instrument_arguments, instrumented, span
+from manifest import MANIFEST_FILE, BuildManifest, file_digest, object_digest, row_digests, sources_digest
+from parallel import SharedArray, run_tasks, shard_ranges
+from percapita import per_capita_block, population_frame
+from population_cache import CACHE_FILE, load_population_dict
+from reference import REFERENCE_DIR, load_reference, reference_file
+from tables import COLUMNAR_EXTENSIONS, HAVE_PYARROW, load_table, numeric_block, period_year, table_path, write_columnar
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
+
+INPUT_FILE = 'Payments Trends Report 2025 - with coordinates.csv'
+
+REPORT_FILE = os.path.join(DATA_DIR, '.build-report.json')
+
+# Modules whose code decides the outputs, hashed into the manifest as the
+# script version: editing any of them rebuilds the stages that use them.
+# Add a module here when it joins the compute path.
+METRIC_SOURCES = ('pipeline.py', 'percapita.py', 'reference.py', 'tables.py', 'countries.py', 'parallel.py')
+GROWTH_SOURCES = ('growth.py', 'export_data.py', 'tables.py', 'countries.py')
+
+# One output file per metric
+OUTPUT_FILES = {
+    'absolute': 'Payments Trends Report 2025 - Absolute.csv',
+    'per_capita': 'Payments Trends Report 2025 - Per Capita.csv',
+    'gdp_percentage': 'Payments Trends Report 2025 - Percent of GDP.csv',
+}
+
+
+def load_input(filepath):
+    """
+    Load the transaction table once; the year columns are taken from its header.
+    filepath may be the CSV or its Arrow/Parquet copy (see tables.table_path).
+    Returns: (DataFrame, year column names, 2-D float array of year values)
+    """
+    table = load_table(filepath)
+    return table.frame, table.columns, table.values
+
+
+def population_block(codes, years, source, cache_path=CACHE_FILE, reference_dir=REFERENCE_DIR):
+    """
+    Population for each country and period as an array aligned with `codes` (ISO3).
+    years holds the calendar year of each period column.
+    source is 'reference' (UN figures in data/reference/population.csv)
+    or 'cache' (World Bank values already in the local cache).
+    """
+    if source == 'reference':
+        return load_reference('population', reference_dir).get(codes, years)
+
+    unique_years = sorted(set(years))
+    pop_dict, _ = load_population_dict(codes.dropna().unique().tolist(), unique_years,
+                                       path=cache_path, offline=True)
+    df_pop = population_frame(pop_dict, unique_years)
+    return df_pop.reindex(index=pd.Index(codes), columns=years).to_numpy(dtype=float)
+
+
+def compute_absolute(values, context):
+    """Transaction values in billions USD, as parsed."""
+    return values, np.ones(len(values), dtype=bool)
+
+
+def compute_per_capita(values, context):
+    """Transaction value per person in USD; cells without population are left empty."""
+    populations = population_block(context['codes'], context['years'], context['population'],
+                                   context['cache'], context['reference'])
+    return per_capita_block(values, populations), np.ones(len(values), dtype=bool)
+
+
+def compute_gdp_percentage(values, context):
+    """
+    Transaction value as % of GDP for the matching year; years without GDP
+    use the nearest year that has it. Countries without GDP data are dropped.
+    """
+    gdp = load_reference('gdp', context['reference']).get(context['codes'], context['years'],
+                                                         fill='nearest')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentage = np.round(values / gdp * 100, 2)
+    return percentage, (np.isfinite(gdp) & (gdp != 0)).any(axis=1)
+
+
+METRICS = {
+    'absolute': compute_absolute,
+    'per_capita': compute_per_capita,
+    'gdp_percentage': compute_gdp_percentage,
+}
+
+
+def reference_digest(name, context):
+    """Hash of the reference table a metric depends on."""
+    if name == 'per_capita':
+        if context['population'] == 'reference':
+            return file_digest(reference_file('population', context['reference']))
+        return object_digest(population_block(context['codes'], context['years'], 'cache',
+                                              context['cache']).tolist())
+    if name == 'gdp_percentage':
+        return file_digest(reference_file('gdp', context['reference']))
+    return None
+
+
+def prepare_incremental(df, year_cols, values, context, changed, output_file):
+    """
+    Start a metric from its previous output file: rows whose country is not
+    in `changed` are taken from it, the rest are left for recomputing.
+    Returns: (block, keep, recompute) for the full table; recompute is a row mask
+    """
+    countries = context['countries']
+    recompute = countries.isin(changed).to_numpy()
+
+    block = np.full(values.shape, np.nan)
+    keep = np.zeros(len(values), dtype=bool)
+
+    if (~recompute).any():
+        previous = pd.read_csv(output_file).set_index('Country')
+        reused = countries[~recompute]
+        block[~recompute] = numeric_block(previous.reindex(reused), year_cols)
+        keep[~recompute] = reused.isin(previous.index).to_numpy()
+
+    return block, keep, recompute
+
+
+def compute_rows(name, values, context, block, keep, recompute):
+    """Fill the recompute rows of a metric's block and keep mask in this process."""
+    if recompute.any():
+        subset = dict(context, countries=context['countries'][recompute],
+                      codes=context['codes'][recompute])
+        block[recompute], keep[recompute] = METRICS[name](values[recompute], subset)
+
+
+def _compute_shard(task):
+    # Worker: compute one metric for one contiguous run of rows, reading the
+    # transaction block and writing the metric's block in shared memory
+    name, values_spec, block_spec, keep_spec, rows, codes, context = task
+    shared = [SharedArray.attach(spec) for spec in (values_spec, block_spec, keep_spec)]
+    try:
+        values, block, keep = (s.array for s in shared)
+        subset = dict(context, codes=pd.Series(codes, dtype=object))
+        block[rows], keep[rows] = METRICS[name](values[rows], subset)
+    finally:
+        values = block = keep = None  # release the views before closing
+        for s in shared:
+            s.close()
+    return len(rows)
+
+
+def compute_parallel(jobs, values, context, workers):
+    """
+    Fill the recompute rows of every job across a process pool.
+    jobs: {metric: (block, keep, recompute)}, updated in place.
+    Each metric's rows are split into `workers` contiguous shards and every
+    (metric, shard) pair is one task, so metrics and countries run side by
+    side. Shards write disjoint rows of shared blocks, and every metric is
+    computed row by row, so the result is identical to compute_rows.
+    """
+    worker_context = {key: context[key] for key in ('years', 'population', 'cache', 'reference')}
+    codes = context['codes'].to_numpy(dtype=object)
+
+    shared = []
+    try:
+        shared_values = SharedArray.copy_of(values)
+        shared.append(shared_values)
+        tasks = []
+        outputs = {}
+        for name, (block, keep, recompute) in jobs.items():
+            outputs[name] = SharedArray.copy_of(block), SharedArray.copy_of(keep)
+            shared.extend(outputs[name])
+            rows = np.flatnonzero(recompute)
+            for start, stop in shard_ranges(len(rows), workers):
+                shard = rows[start:stop]
+                tasks.append((name, shared_values.spec, outputs[name][0].spec, outputs[name][1].spec,
+                              shard, codes[shard].tolist(), worker_context))
+
+        run_tasks(_compute_shard, tasks, workers)
+
+        for name, (block, keep, _) in jobs.items():
+            block[...] = outputs[name][0].array
+            keep[...] = outputs[name][1].array
+    finally:
+        for s in shared:
+            s.close()
+
+
+def write_metric(df, year_cols, block, keep, filepath, columnar=None):
+    """
+    Write one metric: the input table with its year columns replaced by block.
+    columnar ('.arrow' or '.parquet') also writes that copy next to the CSV.
+    """
+    df_out = df.copy()
+    df_out[year_cols] = pd.DataFrame(block, index=df.index, columns=year_cols)
+    df_out[keep].to_csv(filepath, index=False)
+    if columnar:
+        write_columnar(df_out[keep], os.path.splitext(filepath)[0] + columnar)
+    return int(keep.sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute payment metrics in a single pass.')
+    parser.add_argument('--absolute', action='store_true', help='Write absolute values')
+    parser.add_argument('--per-capita', action='store_true', help='Write per capita values')
+    parser.add_argument('--gdp', action='store_true', help='Write values as %% of GDP')
+    parser.add_argument('--population', choices=['reference', 'cache'], default='reference',
+                        help='Population source for per capita values (default: reference)')
+    parser.add_argument('--reference-dir', default=REFERENCE_DIR,
+                        help='Directory with the GDP and population reference tables')
+    parser.add_argument('--cache', default=CACHE_FILE, help='Path to the World Bank cache file')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='Directory with input and output CSVs')
+    parser.add_argument('--manifest', default=MANIFEST_FILE, help='Path to the build manifest')
+    parser.add_argument('--force', action='store_true', help='Recompute everything')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for computing metrics (default: 1, no pool)')
+    parser.add_argument('--columnar', choices=[ext.lstrip('.') for ext in COLUMNAR_EXTENSIONS],
+                        help='Also write each output as .arrow or .parquet (needs pyarrow)')
+    parser.add_argument('--export', action='store_true',
+                        help='Rebuild the hashed page data asset in static/data/ afterwards')
+    parser.add_argument('--dist', action='store_true',
+                        help='Rebuild the minified, fingerprinted pages and assets in dist/ afterwards')
+    add_instrument_arguments(parser, report=REPORT_FILE)
+    args = parser.parse_args()
+
+    if args.columnar and not HAVE_PYARROW:
+        parser.error("--columnar needs the pyarrow package (pip install pyarrow)")
+
+    with instrumented(args, 'pipeline'):
+        run(args)
+    if args.report:
+        print(f"✓ Timings written to {args.report}")
+
+
+def run(args):
+    """Compute and write the selected metrics."""
+    selected = [name for name, flag in (('absolute', args.absolute),
+                                        ('per_capita', args.per_capita),
+                                        ('gdp_percentage', args.gdp)) if flag]
+    selected = selected or list(METRICS)
+
+    input_file = table_path(os.path.join(args.data_dir, INPUT_FILE))
+    print(f"Loading {input_file}...")
+    with span('load') as stage:
+        df, year_cols, values = load_input(input_file)
+        stage.rows = len(df)
+    print(f"✅ Loaded {len(df)} countries")
+
+    with span('join', rows=len(df)):
+        codes, unmatched = load_countries().codes_for(df['Country'])
+    report_unmatched(unmatched, INPUT_FILE)
+
+    context = {
+        'countries': df['Country'],
+        'codes': codes,
+        'years': [period_year(col) for col in year_cols],
+        'population': args.population,
+        'cache': args.cache,
+        'reference': args.reference_dir,
+    }
+
+    if 'gdp_percentage' in selected:
+        filled = sorted(set(load_reference('gdp', args.reference_dir).missing_years(context['years'])))
+        if filled:
+            print(f"⚠ No GDP for {', '.join(map(str, filled))}; using the nearest year with data")
+
+    manifest = BuildManifest(args.manifest)
+    input_digest = file_digest(input_file)
+    code_digest = sources_digest([os.path.join(SCRIPT_DIR, name) for name in METRIC_SOURCES])
+    countries_digest = file_digest(COUNTRIES_FILE)
+    rows = row_digests(df, 'Country', year_cols)
+
+    # Work out what each stale metric needs before computing any of them, so
+    # that with --workers every metric can be sharded onto the same pool
+    plans = {}
+    for name in selected:
+        output_file = os.path.join(args.data_dir, OUTPUT_FILES[name])
+        inputs = {
+            'input': input_digest,
+            'reference': reference_digest(name, context),
+            'code': code_digest,
+            'countries': countries_digest,
+        }
+
+        if not args.force and manifest.is_fresh(name, inputs, output_file):
+            print(f"✓ {name}: up to date, skipped")
+            continue
+
+        changed = set(rows) if args.force else manifest.changed_rows(name, inputs, output_file, rows)
+        plans[name] = (inputs, output_file, changed,
+                       prepare_incremental(df, year_cols, values, context, changed, output_file))
+
+    jobs = {name: plan[3] for name, plan in plans.items()}
+    with span('compute', rows=sum(int(recompute.sum()) for _, _, recompute in jobs.values())):
+        if args.workers > 1 and jobs:
+            compute_parallel(jobs, values, context, args.workers)
+        else:
+            for name, (block, keep, recompute) in jobs.items():
+                with span(name):
+                    compute_rows(name, values, context, block, keep, recompute)
+
+    for name, (inputs, output_file, changed, (block, keep, _)) in plans.items():
+        with span('write'), span(name) as stage:
+            written = stage.rows = write_metric(df, year_cols, block, keep, output_file,
+                                                '.' + args.columnar if args.columnar else None)
+        manifest.record(name, inputs, output_file, rows)
+        print(f"✓ {name}: {written} countries written to {output_file} ({len(changed)} recomputed)")
+
+        missing = df.loc[~keep, 'Country'].tolist()
+        if missing:
+            print(f"  ⚠ {len(missing)} countries skipped: {', '.join(missing[:10])}"
+                  + (" ..." if len(missing) > 10 else ""))
+
+    # Refresh the growth analytics cache the exporter reads (see growth.py),
+    # unless no metric was rewritten and the cache was built from these files
+    growth_inputs = {
+        name: file_digest(table_path(os.path.join(args.data_dir, filename)))
+        for name, filename in export_data.METRIC_FILES.items()
+    }
+    growth_inputs['code'] = sources_digest([os.path.join(SCRIPT_DIR, name) for name in GROWTH_SOURCES])
+    growth_inputs['countries'] = countries_digest
+    if plans or not manifest.is_fresh('growth', growth_inputs, growth.GROWTH_CACHE):
+        with span('growth'):
+            _, periods, codes, blocks = export_data.load_metrics(args.data_dir)
+            export_data.metric_growth(periods, codes, blocks)
+        manifest.record('growth', growth_inputs, growth.GROWTH_CACHE)
+    else:
+        print("✓ growth: up to date, skipped")
+
+    manifest.save()
+
+    if args.export:
+        with span('export'):
+            written, _ = export_data.export_all(args.data_dir)
+        for filename in written.values():
+            print(f"✓ Page asset: static/data/{filename}")
+
+    if args.dist:
+        with span('assets'):
+            entries, rebuilt, _ = build_assets.build()
+        print(f"✓ dist/: {len(rebuilt)} of {len(entries)} files rebuilt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Local on-disk cache for World Bank indicator values.
+Stores one row per (indicator, country code, year) in SQLite so repeated
+pipeline runs can be served from disk instead of the network.
+"""
+
+import os
+import sqlite3
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+CACHE_FILE = os.path.join(PROJECT_ROOT, 'data', 'cache', 'worldbank.sqlite')
+
+POPULATION_INDICATOR = "SP.POP.TOTL"
+
+# Population estimates are revised rarely - refresh monthly by default
+DEFAULT_TTL_DAYS = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    indicator TEXT NOT NULL,
+    country_code TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    value REAL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (indicator, country_code, year)
+) WITHOUT ROWID
+"""
+
+
+class IndicatorCache:
+    """
+    SQLite store of indicator values keyed by indicator, country code and year.
+    A NULL value records that the source has no data for that cell, so known
+    gaps are not fetched again until they expire.
+    """
+
+    def __init__(self, path=CACHE_FILE, ttl_days=DEFAULT_TTL_DAYS):
+        self.path = path
+        self.ttl_seconds = ttl_days * 24 * 60 * 60
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, indicator, country_codes, years, ignore_ttl=False):
+        """
+        Look up cached values.
+        Returns: ({country_code: {year: value}}, [(country_code, year) not cached or expired])
+        Cells the source reported as empty count as cached but are left out of the dict.
+        """
+        wanted_codes = set(country_codes)
+        wanted_years = set(years)
+        if not wanted_codes or not wanted_years:
+            return {}, []
+        cutoff = 0 if ignore_ttl else time.time() - self.ttl_seconds
+
+        rows = self.conn.execute(
+            "SELECT country_code, year, value FROM observations "
+            "WHERE indicator = ? AND year BETWEEN ? AND ? AND fetched_at >= ?",
+            (indicator, min(wanted_years), max(wanted_years), cutoff),
+        )
+
+        values = {}
+        found = set()
+        for country_code, year, value in rows:
+            if country_code not in wanted_codes or year not in wanted_years:
+                continue
+            found.add((country_code, year))
+            if value is not None:
+                values.setdefault(country_code, {})[year] = value
+
+        missing = [(code, year) for code in country_codes for year in years
+                   if (code, year) not in found]
+        return values, missing
+
+    def put(self, indicator, records):
+        """
+        Store (country_code, year, value) records; value may be None.
+        """
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO observations "
+                "(indicator, country_code, year, value, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                ((indicator, code, int(year), value, now) for code, year, value in records),
+            )
+
+    def put_dict(self, indicator, values, country_codes, years):
+        """
+        Store a {country_code: {year: value}} dict, recording requested
+        cells that are absent from it as empty.
+        """
+        self.put(indicator, (
+            (code, year, values.get(code, {}).get(year))
+            for code in country_codes for year in years
+        ))
+
+
+def load_population_dict(country_codes, years, path=CACHE_FILE, ttl_days=DEFAULT_TTL_DAYS,
+                         offline=False):
+    """
+    Serve {country_code: {year: population}} straight from the cache.
+    With offline=True expired entries are used as well.
+    Returns: (population dict, [(country_code, year) still needed from the network])
+    """
+    if not os.path.exists(path):
+        return {}, [(code, year) for code in country_codes for year in years]
+
+    with IndicatorCache(path, ttl_days) as cache:
+        return cache.get(POPULATION_INDICATOR, country_codes, years, ignore_ttl=offline)
+
+
+def add_cache_arguments(parser):
+    """
+    Add the shared --offline / --ttl-days / --cache options to an argparse parser.
+    """
+    parser.add_argument('--offline', action='store_true',
+                        help='Only use cached population data, never touch the network')
+    parser.add_argument('--ttl-days', type=float, default=DEFAULT_TTL_DAYS,
+                        help=f'Refresh cached values older than this (default: {DEFAULT_TTL_DAYS})')
+    parser.add_argument('--cache', default=CACHE_FILE,
+                        help='Path to the SQLite cache file')
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Reference data (GDP, population) keyed by country and year.
+Tables live in data/reference/ as CSV, Arrow or Parquet in the same wide layout
+as the report CSVs (one row per country, one column per year), so adding
+a year means adding a column to the file rather than editing code.
+Rows are keyed by ISO3 code (see countries.py); the Country column is
+only there for people editing the files.
+
+Data sources:
+- gdp.csv: GDP in billions USD, IMF projections via StatisticsTimes.com
+- population.csv: population in millions, UN World Population Prospects 2024
+"""
+
+import os
+
+import numpy as np
+
+from tables import load_table, table_path
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+REFERENCE_DIR = os.path.join(PROJECT_ROOT, 'data', 'reference')
+REFERENCE_KEY = 'ISO3'
+
+# Reference name -> (file stem, multiplier that turns stored values into base units)
+REFERENCES = {
+    'gdp': ('gdp', 1),                      # billions USD, same unit as transaction values
+    'population': ('population', 1_000_000),  # millions -> people
+}
+
+
+class ReferenceStore:
+    """
+    Country x year matrix with dictionary indexes, so a single lookup is
+    O(1) and a batch lookup is one fancy-indexing operation.
+    """
+
+    def __init__(self, countries, years, values, name='reference'):
+        self.name = name
+        self.countries = list(countries)
+        self.years = [int(year) for year in years]
+        self.values = np.asarray(values, dtype=float)
+        self._rows = {country: i for i, country in enumerate(self.countries)}
+        self._cols = {year: j for j, year in enumerate(self.years)}
+
+    @classmethod
+    def load(cls, filepath, scale=1, name=None):
+        """Load a wide country x year table from .csv, .arrow or .parquet."""
+        name = name or os.path.splitext(os.path.basename(filepath))[0]
+        table = load_table(filepath, key=REFERENCE_KEY, frame=False)
+        return cls(table.index, table.columns, table.values * scale, name)
+
+    def __contains__(self, country):
+        return country in self._rows
+
+    def value(self, country, year):
+        """One value, or NaN if the country or year is not in the table."""
+        i = self._rows.get(country)
+        j = self._cols.get(int(year))
+        if i is None or j is None:
+            return np.nan
+        return self.values[i, j]
+
+    def missing_years(self, years):
+        """Requested years that have no column in the table."""
+        return [int(year) for year in years if int(year) not in self._cols]
+
+    def nearest_year(self, year):
+        """The stored year closest to `year` (the later one on a tie)."""
+        return min(self.years, key=lambda stored: (abs(stored - year), -stored))
+
+    def get(self, countries, years, fill=None):
+        """
+        Values for every (country code, year) pair as an array of shape
+        (len(countries), len(years)). Unknown or missing codes give NaN rows.
+        Years without a column give NaN, or with fill='nearest' the values
+        of the nearest stored year; callers should report that via
+        missing_years().
+        """
+        rows = np.array([self._rows.get(country, -1) for country in countries], dtype=int)
+
+        cols = []
+        for year in years:
+            j = self._cols.get(int(year), -1)
+            if j < 0 and fill == 'nearest' and self.years:
+                j = self._cols[self.nearest_year(int(year))]
+            cols.append(j)
+        cols = np.array(cols, dtype=int)
+
+        result = self.values[np.ix_(np.maximum(rows, 0), np.maximum(cols, 0))] if self.values.size \
+            else np.full((len(rows), len(cols)), np.nan)
+        result[rows < 0, :] = np.nan
+        result[:, cols < 0] = np.nan
+        return result
+
+
+def reference_file(name, reference_dir=REFERENCE_DIR):
+    """
+    Path of a reference table: the .arrow or .parquet copy when pyarrow is
+    installed and that copy is not older than the CSV, else the CSV
+    (see tables.table_path).
+    """
+    stem = REFERENCES[name][0]
+    filepath = table_path(os.path.join(reference_dir, stem + '.csv'))
+    if not os.path.exists(filepath):
+        raise FileNotFoundError(f"No {stem}.csv in {reference_dir}")
+    return filepath
+
+
+def load_reference(name, reference_dir=REFERENCE_DIR):
+    """Load a named reference table ('gdp' or 'population') in base units."""
+    return ReferenceStore.load(reference_file(name, reference_dir), scale=REFERENCES[name][1], name=name)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Render build outputs into the named data slots of pages/*.html.
+
+A slot is the text between a pair of marker comments, in HTML:
+    <!-- slot:name -->...<!-- /slot:name -->
+or inside scripts and styles:
+    /* slot:name */.../* /slot:name */
+The markers stay in the page, so every build re-renders the same slots.
+Each page is rendered in one linear pass; a slot that is expected but not
+found, an unknown slot or unbalanced markers are reported as errors.
+"""
+
+import json
+import os
+import re
+import sys
+
+import geometry
+import snapshots
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+PAGES_DIR = os.path.join(PROJECT_ROOT, 'pages')
+ASSET_MANIFEST = os.path.join(PROJECT_ROOT, 'static', 'data', 'manifest.json')
+
+SLOT_MARKER = re.compile(
+    r'<!--\s*(?P<html_close>/)?slot:(?P<html_name>[\w-]+)\s*-->'
+    r'|/\*\s*(?P<js_close>/)?slot:(?P<js_name>[\w-]+)\s*\*/'
+)
+
+
+class TemplateError(ValueError):
+    """Raised when a page's slots do not match the values being rendered."""
+
+
+def iter_slots(template, source='<template>'):
+    """
+    Yield (name, content_start, content_end) for every slot in the template.
+    """
+    open_name = None
+    open_end = None
+
+    for match in SLOT_MARKER.finditer(template):
+        name = match.group('html_name') or match.group('js_name')
+        closing = bool(match.group('html_close') or match.group('js_close'))
+
+        if not closing:
+            if open_name is not None:
+                raise TemplateError(f"{source}: slot '{name}' opened inside slot '{open_name}'")
+            open_name, open_end = name, match.end()
+        else:
+            if open_name != name:
+                raise TemplateError(f"{source}: closing marker for '{name}' without a matching opening marker")
+            yield name, open_end, match.start()
+            open_name = None
+
+    if open_name is not None:
+        raise TemplateError(f"{source}: slot '{open_name}' is never closed")
+
+
+def find_slots(template, source='<template>'):
+    """Names of the slots in a template, in order."""
+    return [name for name, _, _ in iter_slots(template, source)]
+
+
+def render(template, values, source='<template>'):
+    """
+    Replace the content of every slot with values[name].
+    Every slot in the template must have a value and every value must have a slot.
+    """
+    parts = []
+    position = 0
+    seen = set()
+
+    for name, start, end in iter_slots(template, source):
+        if name not in values:
+            raise TemplateError(f"{source}: no value for slot '{name}'")
+        parts.append(template[position:start])
+        parts.append(values[name])
+        position = end
+        seen.add(name)
+
+    missing = set(values) - seen
+    if missing:
+        raise TemplateError(f"{source}: missing slot(s) {', '.join(sorted(missing))}")
+
+    parts.append(template[position:])
+    return ''.join(parts)
+
+
+def render_page(page_file, values):
+    """
+    Render a page.
+    Returns: (rendered text, True if it differs from the file on disk)
+    """
+    with open(page_file, 'r', encoding='utf-8') as f:
+        template = f.read()
+
+    rendered = render(template, values, os.path.basename(page_file))
+    return rendered, rendered != template
+
+
+def load_asset_manifest(manifest_file=ASSET_MANIFEST):
+    """Hashed asset filenames written by the export stages."""
+    if not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def page_values(assets):
+    """
+    Slot values for each page, built from the asset manifest and the
+    chart snapshots of dashboardData in data.js.
+    Returns: {page filename: {slot name: text}}
+    """
+    values = {}
+    if 'payments' in assets:
+        values.setdefault('global-reach-growth.html', {})['payment-data-url'] = \
+            json.dumps(f"../static/data/{assets['payments']}")
+    # Boundaries come from GitHub until the source has been vendored (geometry.py --fetch)
+    geometry_url = f"../static/data/{assets['countries']}" if 'countries' in assets else geometry.SOURCE_URL
+    values.setdefault('global-reach-growth.html', {})['geometry-url'] = json.dumps(geometry_url)
+    for page, slots in snapshots.page_snapshots(snapshots.load_dashboard_data()).items():
+        values.setdefault(page, {}).update(slots)
+    return values
+
+
+def render_all(pages_dir=PAGES_DIR, manifest_file=ASSET_MANIFEST):
+    """
+    Render every page in pages_dir. Pages without slots are left alone.
+    All pages are rendered before any is written, so a slot error leaves
+    every file untouched.
+    Returns: list of pages that changed
+    """
+    values_by_page = page_values(load_asset_manifest(manifest_file))
+    updates = {}
+
+    for filename in sorted(os.listdir(pages_dir)):
+        if not filename.endswith('.html'):
+            continue
+        page_file = os.path.join(pages_dir, filename)
+        rendered, changed = render_page(page_file, values_by_page.get(filename, {}))
+        if changed:
+            updates[page_file] = rendered
+
+    for page_file, rendered in updates.items():
+        with open(page_file, 'w', encoding='utf-8') as f:
+            f.write(rendered)
+
+    return [os.path.basename(page_file) for page_file in updates]
+
+
+def main():
+    try:
+        changed = render_all()
+    except (TemplateError, snapshots.DataError) as e:
+        print(f"ERROR: {e}")
+        return False
+
+    if changed:
+        for filename in changed:
+            print(f"✓ Rendered {filename}")
+    else:
+        print("✓ All pages already up to date")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
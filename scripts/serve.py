@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Static server for the dashboard pages, replacing `python3 -m http.server`.
+Built on the standard library's ThreadingHTTPServer with HTTP/1.1
+keep-alive, and for every response:
+
+- picks a precompressed .br or .gz sibling when Accept-Encoding allows it
+  (and gzips other text responses once, in memory);
+- sends a strong ETag derived from the content hash and answers
+  If-None-Match with 304 Not Modified;
+- marks content-hashed files (payments.a6fdd5dce33e.json) as immutable
+  for a year and everything else as no-cache, so browsers and iframe
+  embeds revalidate with a cheap 304 instead of downloading again.
+
+Only pages/ and static/ under the root are served. Vector tiles from
+data/tiles/countries.mbtiles (see tiles.py) are served at
+/tiles/{z}/{x}/{y}.pbf when that file exists.
+
+Usage:
+    python3 scripts/serve.py                  # http://127.0.0.1:8000/pages/
+    python3 scripts/serve.py --port 8080 --host 0.0.0.0
+    python3 scripts/serve.py --root dist      # serve the built assets (see build_assets.py)
+"""
+
+import argparse
+import gzip
+import hashlib
+import html
+import mimetypes
+import os
+import re
+import sqlite3
+import sys
+import threading
+import urllib.parse
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+TILES_FILE = os.path.join(PROJECT_ROOT, 'data', 'tiles', 'countries.mbtiles')
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+
+# Top-level directories that may be served; everything else (data/, scripts/) is not
+SERVED_DIRS = ('pages', 'static')
+INDEX_PATH = '/pages/'
+
+# Content-hashed filenames, e.g. payments.a6fdd5dce33e.json or charts.3f9c0a1b.js
+HASHED_NAME = re.compile(r'\.[0-9a-f]{8,}\.[A-Za-z0-9]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+# Encodings in order of preference, with the sibling extension for each
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+COMPRESSIBLE = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+MIN_COMPRESS_SIZE = 1024
+KEEP_ALIVE_TIMEOUT = 15  # seconds an idle connection is kept open
+
+TILE_PATH = re.compile(r'^/tiles/(\d+)/(\d+)/(\d+)\.pbf$')
+
+mimetypes.add_type('text/javascript', '.js')
+mimetypes.add_type('application/json', '.json')
+mimetypes.add_type('application/x-protobuf', '.pbf')
+
+
+def content_type(path):
+    kind, encoding = mimetypes.guess_type(path)
+    if encoding or not kind:
+        # A .gz/.br file requested by name is opaque bytes, not its inner type
+        return 'application/octet-stream'
+    if kind.startswith('text/') or kind in ('application/json', 'image/svg+xml'):
+        kind += '; charset=utf-8'
+    return kind
+
+
+def accepted_encodings(header):
+    """Encodings a client accepts (q > 0), from an Accept-Encoding header."""
+    accepted = set()
+    for part in (header or '').split(','):
+        token, _, params = part.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if token and quality > 0:
+            accepted.add(token.strip().lower())
+    if '*' in accepted:
+        accepted.update(name for name, _ in ENCODINGS)
+    return accepted
+
+
+def etag_matches(header, etag):
+    """If-None-Match check (weak comparison, as RFC 9110 requires for it)."""
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    tags = [tag.strip() for tag in header.split(',')]
+    return etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+
+
+class Representation:
+    """One encoding of one file: body bytes plus the headers that describe it."""
+
+    def __init__(self, body, etag, encoding=None):
+        self.body = body
+        self.etag = etag
+        self.encoding = encoding
+
+
+class FileCache:
+    """
+    File contents, hashes and compressed variants, keyed by path and
+    invalidated when the file's size or mtime changes. Shared by all
+    request threads.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _stamp(self, path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, path, accepted):
+        """The best Representation of path for the accepted encodings."""
+        stamp = self._stamp(path)
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is None or entry['stamp'] != stamp:
+            with open(path, 'rb') as f:
+                body = f.read()
+            digest = hashlib.sha256(body).hexdigest()[:32]
+            entry = {'stamp': stamp, 'identity': Representation(body, f'"{digest}"'), 'variants': {}}
+            with self._lock:
+                self._entries[path] = entry
+
+        for encoding, extension in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            variant = self._variant(path, entry, encoding, extension)
+            if variant is not None:
+                return variant
+        return entry['identity']
+
+    def _variant(self, path, entry, encoding, extension):
+        variants = entry['variants']
+        if encoding in variants:
+            return variants[encoding]
+
+        identity = entry['identity']
+        sibling = path + extension
+        body = None
+        if os.path.exists(sibling) and os.path.getmtime(sibling) >= os.path.getmtime(path):
+            with open(sibling, 'rb') as f:
+                body = f.read()
+        elif (encoding == 'gzip' and len(identity.body) >= MIN_COMPRESS_SIZE
+              and content_type(path).startswith(COMPRESSIBLE)):
+            body = gzip.compress(identity.body, compresslevel=9, mtime=0)
+
+        variant = None
+        if body is not None and len(body) < len(identity.body):
+            # A distinct strong validator per encoding of the same content
+            variant = Representation(body, identity.etag[:-1] + f'-{encoding}"', encoding)
+        with self._lock:
+            variants[encoding] = variant
+        return variant
+
+
+class TileStore:
+    """Read-only access to an MBTiles file, one SQLite connection per thread."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def available(self):
+        return os.path.exists(self.path)
+
+    def get(self, z, x, y):
+        """Gzipped tile bytes for z/x/y (XYZ scheme), or None."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, check_same_thread=False)
+            self._local.connection = connection
+        row = connection.execute(
+            'SELECT tile_data FROM tiles WHERE zoom_level = ? AND tile_column = ? AND tile_row = ?',
+            (z, x, (1 << z) - 1 - y),
+        ).fetchone()
+        return row[0] if row else None
+
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    """Serves pages/ and static/ with compression, validators and cache headers."""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'TPADashboard'
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Headers and body go out as separate writes; without TCP_NODELAY the
+    # body waits on the client's delayed ACK (~40 ms) on a kept-alive socket
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def respond(self, send_body):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        if path in ('', '/'):
+            return self.redirect(INDEX_PATH)
+
+        tile = TILE_PATH.match(path)
+        if tile:
+            return self.serve_tile(*(int(n) for n in tile.groups()), send_body=send_body)
+
+        filepath = self.resolve(path)
+        if filepath is None:
+            return self.send_status(HTTPStatus.NOT_FOUND, send_body)
+        if os.path.isdir(filepath):
+            if not path.endswith('/'):
+                return self.redirect(path + '/')
+            index = os.path.join(filepath, 'index.html')
+            if not os.path.isfile(index):
+                return self.serve_listing(filepath, path, send_body)
+            filepath = index
+
+        accepted = accepted_encodings(self.headers.get('Accept-Encoding'))
+        representation = self.server.files.get(filepath, accepted)
+        cache_control = IMMUTABLE if HASHED_NAME.search(filepath) else REVALIDATE
+        self.send_representation(representation, content_type(filepath), cache_control, send_body)
+
+    def resolve(self, path):
+        """Filesystem path for a URL path inside a served directory, or None."""
+        parts = [part for part in path.split('/') if part]
+        if not parts or parts[0] not in SERVED_DIRS:
+            return None
+        if any(part in ('.', '..') or part.startswith('.') for part in parts):
+            return None
+        filepath = os.path.join(self.server.root, *parts)
+        return filepath if os.path.exists(filepath) else None
+
+    def send_representation(self, representation, kind, cache_control, send_body):
+        headers = {
+            'ETag': representation.etag,
+            'Cache-Control': cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+        if etag_matches(self.headers.get('If-None-Match'), representation.etag):
+            # No Content-Length: on a 304 it would have to be the 200 body's length
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', kind)
+        self.send_header('Content-Length', str(len(representation.body)))
+        if representation.encoding:
+            self.send_header('Content-Encoding', representation.encoding)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(representation.body)
+
+    def serve_tile(self, z, x, y, send_body):
+        store = self.server.tiles
+        data = store.get(z, x, y) if store.available() else None
+        if data is None:
+            return self.send_status(HTTPStatus.NO_CONTENT if store.available() else HTTPStatus.NOT_FOUND,
+                                    send_body)
+        etag = f'"{hashlib.sha256(data).hexdigest()[:32]}-gzip"'
+        if 'gzip' in accepted_encodings(self.headers.get('Accept-Encoding')):
+            representation = Representation(data, etag, 'gzip')
+        else:
+            representation = Representation(gzip.decompress(data), etag.replace('-gzip', ''))
+        self.send_representation(representation, 'application/x-protobuf', REVALIDATE, send_body)
+
+    def serve_listing(self, dirpath, path, send_body):
+        names = sorted(name for name in os.listdir(dirpath) if not name.startswith('.'))
+        items = ''.join(
+            f'<li><a href="{urllib.parse.quote(name)}{"/" if os.path.isdir(os.path.join(dirpath, name)) else ""}">'
+            f'{html.escape(name)}</a></li>'
+            for name in names
+        )
+        body = (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(path)}</title></head>'
+                f'<body><h1>{html.escape(path)}</h1><ul>{items}</ul></body></html>').encode('utf-8')
+        representation = Representation(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        self.send_representation(representation, 'text/html; charset=utf-8', REVALIDATE, send_body)
+
+    def redirect(self, location):
+        self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def send_status(self, status, send_body):
+        body = f'{status.value} {status.phrase}\n'.encode('utf-8') if status != HTTPStatus.NO_CONTENT else b''
+        self.send_response(status)
+        if body:
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        if status != HTTPStatus.NO_CONTENT:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body and body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class DashboardServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer with the shared file cache and tile store."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, root=PROJECT_ROOT, tiles_file=TILES_FILE, quiet=False):
+        super().__init__(address, DashboardHandler)
+        self.root = os.path.abspath(root)
+        self.files = FileCache()
+        self.tiles = TileStore(tiles_file)
+        self.quiet = quiet
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the dashboard pages.')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Address to bind (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+    parser.add_argument('--root', default=PROJECT_ROOT, help='Directory containing pages/ and static/')
+    parser.add_argument('--tiles', default=TILES_FILE, help='MBTiles file served under /tiles/')
+    parser.add_argument('--quiet', action='store_true', help='Do not log requests')
+    args = parser.parse_args()
+
+    server = DashboardServer((args.host, args.port), args.root, args.tiles, args.quiet)
+    host, port = server.server_address[:2]
+    print(f"✓ Serving {os.path.relpath(server.root)} at http://{host}:{port}{INDEX_PATH} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        server.server_close()
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
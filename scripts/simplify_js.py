@@ -2,38 +2,53 @@
 """
 Simplify the JavaScript in global-reach-growth.html
 Remove all view-switching code and update references
+All renames and removals are applied in a single pass over the page.
 """
 
+import os
 import re
 
-html_file = '/Users/JackRobertson/TPA-Dash/pages/global-reach-growth.html'
+script_dir = os.path.dirname(os.path.abspath(__file__))
+html_file = os.path.join(os.path.dirname(script_dir), 'pages', 'global-reach-growth.html')
+
+# Literal renames
+REPLACEMENTS = {
+    'paymentDataAbsolute': 'paymentData',
+    'getPaymentData()': 'paymentData',
+    "currentView === 'absolute'": 'true',
+    "currentView === 'percapita'": 'false',
+    'Transaction Value (2025)': 'Digital Payment Value (2025)',
+    'Transaction Intensity (2025)': 'Digital Payment Value (2025)',
+    'Payment Value': 'Digital Payment Value',
+    'sidebar-absolute': 'sidebar',
+    'sidebar-percapita': 'sidebar-hidden',
+}
+
+# Blocks to remove entirely
+REMOVALS = [
+    # The updateHeaderDescription function (it's not needed anymore)
+    r'    // Update header description based on view\s+function updateHeaderDescription\(\) \{[^}]+\}\s+',
+    # The switchView function
+    r'    // Toggle view and refresh map\s+function switchView\([^)]+\) \{[^}]+\}\s+',
+    # The view toggle event listener
+    r"    // Handle view toggle dropdown\s+document\.getElementById\('view-toggle'\)\.addEventListener\([^;]+\);\s+",
+    # Sidebar-percapita display toggle code
+    r"        document\.getElementById\('sidebar-percapita'\)\.style\.display[^;]+;\s+",
+]
+
+# Removals come first so they win over renames starting at the same place;
+# longer renames are tried before their prefixes
+PATTERN = re.compile('|'.join(
+    [f'(?:{pattern})' for pattern in REMOVALS]
+    + [re.escape(old) for old in sorted(REPLACEMENTS, key=len, reverse=True)]
+))
 
 # Read the file
 with open(html_file, 'r', encoding='utf-8') as f:
     content = f.read()
 
-# Replace all occurrences
-content = content.replace('paymentDataAbsolute', 'paymentData')
-content = content.replace('getPaymentData()', 'paymentData')
-content = content.replace("currentView === 'absolute'", 'true')
-content = content.replace("currentView === 'percapita'", 'false')
-content = content.replace('Transaction Value (2025)', 'Digital Payment Value (2025)')
-content = content.replace('Transaction Intensity (2025)', 'Digital Payment Value (2025)')
-content = content.replace('Payment Value', 'Digital Payment Value')
-content = content.replace('sidebar-absolute', 'sidebar')
-content = content.replace('sidebar-percapita', 'sidebar-hidden')
-
-# Remove the updateHeaderDescription function (it's not needed anymore)
-content = re.sub(r'    // Update header description based on view\s+function updateHeaderDescription\(\) \{[^}]+\}\s+', '', content, flags=re.DOTALL)
-
-# Remove the switchView function
-content = re.sub(r'    // Toggle view and refresh map\s+function switchView\([^)]+\) \{[^}]+\}\s+', '', content, flags=re.DOTALL)
-
-# Remove the view toggle event listener
-content = re.sub(r"    // Handle view toggle dropdown\s+document\.getElementById\('view-toggle'\)\.addEventListener\([^;]+\);\s+", '', content)
-
-# Remove sidebar-percapita display toggle code
-content = re.sub(r"        document\.getElementById\('sidebar-percapita'\)\.style\.display[^;]+;\s+", '', content)
+# One pass: each match is either renamed or removed
+content = PATTERN.sub(lambda match: REPLACEMENTS.get(match.group(0), ''), content)
 
 # Write back
 with open(html_file, 'w', encoding='utf-8') as f:
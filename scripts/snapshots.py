@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Static SVG snapshots of the Chart.js dashboard charts.
+Each chart on the industry outlook and merchant pages is drawn from
+dashboardData (static/js/data.js) the way its Chart.js configuration draws
+it on a desktop layout, and render_pages.py inlines the result into the
+chart's container as <svg class="chart-snapshot">. The page removes the
+snapshot once Chart.js has rendered the chart on the canvas underneath,
+so the first paint shows the charts without waiting for any script.
+
+The renderer covers the chart types these pages use (horizontal and
+stacked bars, a doughnut and a line chart) and writes plain SVG with no
+dependencies beyond the standard library.
+
+Usage:
+    python3 scripts/snapshots.py                   # list the snapshots and their sizes
+    python3 scripts/snapshots.py --output out/     # also write each one as an .svg file
+"""
+
+import argparse
+import ast
+import html
+import math
+import os
+import re
+import sys
+
+from build_assets import minify_js
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+DATA_JS = os.path.join(PROJECT_ROOT, 'static', 'js', 'data.js')
+
+WIDTH, HEIGHT = 600, 320
+PADDING = 10
+TICK_SPACING = 30        # smallest gap between value-axis ticks, in px
+CHAR_WIDTH = 0.55        # average glyph width, in em
+CATEGORY_FRACTION = 0.8 * 0.9  # Chart.js categoryPercentage x barPercentage
+BAR_RADIUS = 5
+
+FONT_FAMILY = 'Helvetica, Arial, sans-serif'
+TEXT_COLOR = '#E0E0E0'
+GRID_COLOR = '#3A4655'
+BORDER_COLOR = '#323D4D'
+
+# chartColors in the pages
+PRIMARY = '#01D6B0'
+SECONDARY = '#00B399'
+TERTIARY = '#008B7A'
+LIGHT = '#01F0C7'
+GREEN_VARIANTS = ['#004F47', '#006B5F', '#008878', '#00A896', '#00C4AB',
+                  '#01D6B0', '#01E5BB', '#01F0C7', '#20F5D1', '#3AF9D9']
+
+TOKEN = re.compile(r"""\s*(?:(?P<string>'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*")"""
+                   r'|(?P<number>-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)'
+                   r'|(?P<name>[A-Za-z_$][\w$]*)'
+                   r'|(?P<punct>[{}\[\]:,;]))')
+LITERALS = {'true': True, 'false': False, 'null': None}
+
+
+# ---------------------------------------------------------------------------
+# dashboardData
+
+
+class DataError(ValueError):
+    """Raised when dashboardData is not a plain object literal."""
+
+
+def _tokens(source, start):
+    position = start
+    while True:
+        match = TOKEN.match(source, position)
+        if not match:
+            raise DataError(f"unexpected input at offset {position}: {source[position:position + 20]!r}")
+        yield match
+        position = match.end()
+
+
+def _parse(tokens, token):
+    """Value starting at token; returns (value, next token)."""
+    if token.group('string'):
+        return ast.literal_eval(token.group('string')), next(tokens)
+    if token.group('number'):
+        return float(token.group('number')), next(tokens)
+    if token.group('name'):
+        if token.group('name') not in LITERALS:
+            raise DataError(f"'{token.group('name')}' is not a literal")
+        return LITERALS[token.group('name')], next(tokens)
+
+    opening = token.group('punct')
+    closing = {'{': '}', '[': ']'}.get(opening)
+    if closing is None:
+        raise DataError(f"unexpected '{opening}'")
+    items = {} if opening == '{' else []
+    token = next(tokens)
+    while token.group('punct') != closing:
+        if opening == '{':
+            key = token.group('name') or ast.literal_eval(token.group('string') or '')
+            if next(tokens).group('punct') != ':':
+                raise DataError(f"expected ':' after '{key}'")
+            items[key], token = _parse(tokens, next(tokens))
+        else:
+            value, token = _parse(tokens, token)
+            items.append(value)
+        if token.group('punct') == ',':
+            token = next(tokens)
+        elif token.group('punct') != closing:
+            raise DataError(f"expected ',' or '{closing}'")
+    return items, next(tokens, None)
+
+
+def load_dashboard_data(data_file=DATA_JS):
+    """The dashboardData object literal from data.js, as Python values."""
+    with open(data_file, 'r', encoding='utf-8') as f:
+        source = minify_js(f.read())
+    match = re.search(r'\bdashboardData\s*=\s*(?=\{)', source)
+    if not match:
+        raise DataError(f"{os.path.basename(data_file)}: no dashboardData object")
+    tokens = _tokens(source, match.end())
+    value, _ = _parse(tokens, next(tokens))
+    return value
+
+
+# ---------------------------------------------------------------------------
+# SVG helpers
+
+
+def _number(value):
+    """Shortest SVG coordinate at 0.1 precision."""
+    return f'{value:.1f}'.rstrip('0').rstrip('.')
+
+
+def _text_width(text, size):
+    return len(text) * size * CHAR_WIDTH
+
+
+def _label(text):
+    """Chart.js draws a string label on one line, newlines included."""
+    return text.replace('\n', ' ')
+
+
+def _text(x, y, text, size, anchor='start', weight=None):
+    attributes = f' font-size="{size}"'
+    if anchor != 'start':
+        attributes += f' text-anchor="{anchor}"'
+    if weight:
+        attributes += f' font-weight="{weight}"'
+    return (f'<text x="{_number(x)}" y="{_number(y)}" dominant-baseline="middle"{attributes}>'
+            f'{html.escape(text)}</text>')
+
+
+def _rect(x, y, width, height, fill, radius=0):
+    corner = f' rx="{_number(min(radius, width / 2, height / 2))}"' if radius else ''
+    return (f'<rect x="{_number(x)}" y="{_number(y)}" width="{_number(width)}" '
+            f'height="{_number(height)}"{corner} fill="{fill}"/>')
+
+
+def _line(x1, y1, x2, y2, stroke=GRID_COLOR):
+    return (f'<line x1="{_number(x1)}" y1="{_number(y1)}" x2="{_number(x2)}" y2="{_number(y2)}" '
+            f'stroke="{stroke}"/>')
+
+
+def _svg(title, parts):
+    return (f'<svg class="chart-snapshot" viewBox="0 0 {WIDTH} {HEIGHT}" role="img" '
+            f'aria-label="{html.escape(title)}" font-family="{FONT_FAMILY}" fill="{TEXT_COLOR}">'
+            + ''.join(parts) + '</svg>')
+
+
+def ticks(maximum, length):
+    """Value-axis ticks from 0 to maximum, at least TICK_SPACING px apart."""
+    most = max(1, int(length // TICK_SPACING))
+    magnitude = 10 ** math.floor(math.log10(maximum / most))
+    step = next(magnitude * factor for factor in (1, 2, 5, 10) if maximum / (magnitude * factor) <= most)
+    return [round(i * step, 10) for i in range(int(maximum / step + 1e-9) + 1)]
+
+
+def legend(items, top, size, box=(40, 12), padding=10):
+    """
+    A Chart.js-style legend centred under the plot, wrapping into rows.
+    items: [(label, swatch markup function (x, y, width, height))]
+    Returns: (markup, height)
+    """
+    box_width, box_height = box
+    widths = [box_width + size / 2 + _text_width(label, size) + padding for label, _ in items]
+    rows, row = [], []
+    for item, width in zip(items, widths):
+        if row and sum(w for _, w in row) + width > WIDTH - 2 * PADDING:
+            rows.append(row)
+            row = []
+        row.append((item, width))
+    rows.append(row)
+
+    parts = []
+    line_height = max(size, box_height) + padding
+    for r, row in enumerate(rows):
+        x = (WIDTH - sum(width for _, width in row) + padding) / 2
+        y = top + r * line_height + padding / 2
+        for (label, swatch), width in row:
+            parts.append(swatch(x, y, box_width, box_height))
+            parts.append(_text(x + box_width + size / 2, y + box_height / 2, label, size))
+            x += width
+    return ''.join(parts), len(rows) * line_height
+
+
+# ---------------------------------------------------------------------------
+# Chart types
+
+
+def horizontal_bars(title, labels, series, maximum, suffix, stacked=False, show_legend=False,
+                    tick_size=12, label_size=12, legend_size=10):
+    """
+    A bar chart with indexAxis "y".
+    series: [(label, values, colour or [colour per bar])]
+    """
+    labels = [_label(label) for label in labels]
+    left = PADDING + max(_text_width(label, label_size) for label in labels) + PADDING
+    right = WIDTH - PADDING - _text_width(f'{maximum:g}{suffix}', tick_size) / 2
+    parts, bottom = [], HEIGHT - PADDING
+    if show_legend:
+        markup, height = legend(
+            [(name, lambda x, y, w, h, colour=colour: _rect(x, y, w, h, colour)) for name, _, colour in series],
+            0, legend_size, box=(legend_size + 2, legend_size + 2))
+        bottom -= height
+        parts.append(f'<g transform="translate(0 {_number(bottom + PADDING / 2)})">{markup}</g>')
+    bottom -= tick_size + PADDING
+    top = PADDING
+
+    scale = (right - left) / maximum
+    for tick in ticks(maximum, right - left):
+        x = left + tick * scale
+        parts.append(_line(x, top, x, bottom))
+        parts.append(_text(x, bottom + PADDING / 2 + tick_size / 2, f'{tick:g}{suffix}', tick_size, 'middle'))
+
+    slot = (bottom - top) / len(labels)
+    thickness = slot * CATEGORY_FRACTION / (1 if stacked else len(series))
+    for i, label in enumerate(labels):
+        centre = top + slot * (i + 0.5)
+        parts.append(_text(left - PADDING, centre, label, label_size, 'end', '500'))
+        offset = 0
+        for s, (_, values, colour) in enumerate(series):
+            fill = colour[i % len(colour)] if isinstance(colour, list) else colour
+            y = centre - thickness / 2 if stacked else centre - thickness * len(series) / 2 + s * thickness
+            width = min(values[i], maximum) * scale
+            parts.append(_rect(left + offset * scale, y, min(width, right - left - offset * scale), thickness,
+                               fill, 0 if stacked else BAR_RADIUS))
+            if stacked:
+                offset += values[i]
+    return _svg(title, parts)
+
+
+def doughnut(title, labels, values, colours, legend_size=10):
+    """A doughnut with the default 50% cutout and the legend underneath."""
+    markup, height = legend(
+        [(_label(label), lambda x, y, w, h, colour=colour: _rect(x, y, w, h, colour))
+         for label, colour in zip(labels, colours)], 0, legend_size)
+    parts = [f'<g transform="translate(0 {_number(HEIGHT - PADDING - height)})">{markup}</g>']
+
+    plot_height = HEIGHT - 2 * PADDING - height
+    cx, cy = WIDTH / 2, PADDING + plot_height / 2
+    outer = plot_height / 2
+    inner = outer / 2
+    total = sum(values)
+    angle = -math.pi / 2
+    for value, colour in zip(values, colours):
+        sweep = 2 * math.pi * value / total
+        end = angle + sweep
+        large = 1 if sweep > math.pi else 0
+        points = [(cx + r * math.cos(a), cy + r * math.sin(a))
+                  for r, a in ((outer, angle), (outer, end), (inner, end), (inner, angle))]
+        (x1, y1), (x2, y2), (x3, y3), (x4, y4) = [(_number(x), _number(y)) for x, y in points]
+        parts.append(f'<path d="M{x1} {y1}A{_number(outer)} {_number(outer)} 0 {large} 1 {x2} {y2}'
+                     f'L{x3} {y3}A{_number(inner)} {_number(inner)} 0 {large} 0 {x4} {y4}Z" '
+                     f'fill="{colour}" stroke="{BORDER_COLOR}" stroke-width="2"/>')
+        angle = end
+    return _svg(title, parts)
+
+
+def control_points(previous, current, following, tension):
+    """Chart.js splineCurve: the Bezier control points either side of a point."""
+    d01 = math.dist(previous, current)
+    d12 = math.dist(current, following)
+    total = d01 + d12
+    fa = tension * d01 / total if total else 0
+    fb = tension * d12 / total if total else 0
+    dx, dy = following[0] - previous[0], following[1] - previous[1]
+    return (current[0] - fa * dx, current[1] - fa * dy), (current[0] + fb * dx, current[1] + fb * dy)
+
+
+def lines(title, labels, series, maximum, suffix, tension=0.4, tick_size=13, label_size=12, legend_size=10):
+    """
+    A line chart with points, a category x axis and the legend underneath.
+    series: [(label, values, colour)]
+    """
+    markup, height = legend(
+        [(name, lambda x, y, w, h, colour=colour:
+          f'<rect x="{_number(x)}" y="{_number(y)}" width="{w}" height="{h}" fill="{colour}" '
+          f'fill-opacity="0.06" stroke="{colour}" stroke-width="3"/>') for name, _, colour in series],
+        0, legend_size)
+    parts = [f'<g transform="translate(0 {_number(HEIGHT - PADDING - height)})">{markup}</g>']
+
+    top = PADDING + tick_size / 2
+    bottom = HEIGHT - 2 * PADDING - height - label_size - PADDING
+    left = PADDING + _text_width(f'{maximum:g}{suffix}', tick_size) + PADDING
+    right = WIDTH - PADDING - _text_width(labels[-1], label_size) / 2
+
+    scale = (bottom - top) / maximum
+    for tick in ticks(maximum, bottom - top):
+        y = bottom - tick * scale
+        parts.append(_line(left, y, right, y))
+        parts.append(_text(left - PADDING, y, f'{tick:g}{suffix}', tick_size, 'end'))
+
+    step = (right - left) / max(1, len(labels) - 1)
+    for i, label in enumerate(labels):
+        parts.append(_text(left + i * step, bottom + PADDING + label_size / 2, _label(label),
+                           label_size, 'middle', '500'))
+
+    for _, values, colour in series:
+        points = [(left + i * step, bottom - min(value, maximum) * scale) for i, value in enumerate(values)]
+        controls = [control_points(points[max(i - 1, 0)], point, points[min(i + 1, len(points) - 1)], tension)
+                    for i, point in enumerate(points)]
+        path = [f'M{_number(points[0][0])} {_number(points[0][1])}']
+        for i in range(1, len(points)):
+            (ax, ay), (bx, by), (x, y) = controls[i - 1][1], controls[i][0], points[i]
+            path.append(f'C{_number(ax)} {_number(ay)} {_number(bx)} {_number(by)} {_number(x)} {_number(y)}')
+        parts.append(f'<path d="{"".join(path)}" fill="none" stroke="{colour}" stroke-width="3"/>')
+        parts.extend(f'<circle cx="{_number(x)}" cy="{_number(y)}" r="4" fill="{colour}" stroke="{BORDER_COLOR}"/>'
+                     for x, y in points)
+    return _svg(title, parts)
+
+
+# ---------------------------------------------------------------------------
+# The pages' charts, as configured in their initializeCharts()
+
+
+def budget_chart(data):
+    priorities = data['investmentPriorities']
+    return horizontal_bars('Investment priorities, share of budget', priorities['labels'],
+                           [('', priorities['data'], GREEN_VARIANTS)], 20, '%')
+
+
+def outlook_chart(data):
+    sentiment = data['sentiment']
+    return doughnut('Industry outlook sentiment', sentiment['labels'], sentiment['data'],
+                    [PRIMARY, LIGHT, SECONDARY, '#4A5668'])
+
+
+def challenges_chart(data):
+    challenges = data['challenges']
+    series = [(dataset['label'], dataset['data'], colour)
+              for dataset, colour in zip(challenges['datasets'], [PRIMARY, SECONDARY, TERTIARY])]
+    return lines('Key industry challenges by year', challenges['years'], series, 35, '%')
+
+
+def card_network_chart(data):
+    networks = data['cardNetworks']
+    return horizontal_bars('Cards in circulation by network, billions', networks['labels'],
+                           [('Cards in Circulation (Billions)', networks['data'], GREEN_VARIANTS[:5])],
+                           10, 'B', tick_size=13)
+
+
+def payment_challenges_chart(data):
+    challenges = data['paymentChallenges']
+    series = [(dataset['label'], dataset['data'], colour)
+              for dataset, colour in zip(challenges['datasets'], ['#004F47', '#006B5F', '#00A896', '#01D6B0'])]
+    return horizontal_bars('Merchant payment challenges by severity', challenges['labels'], series,
+                           100, '%', stacked=True, show_legend=True, tick_size=10)
+
+
+def service_fees_chart(data):
+    fees = data['serviceFees']
+    return horizontal_bars('Merchant service fees by payment method', fees['labels'],
+                           [('Service Fee Range (%)', fees['data'], [PRIMARY, LIGHT, '#00B399', SECONDARY, TERTIARY])],
+                           5, '%', tick_size=13)
+
+
+# page -> {canvas id: renderer}
+PAGE_CHARTS = {
+    'Industry_Outlook_Key_Challenge-single-screen.html': {
+        'budgetChart': budget_chart,
+        'outlookChart': outlook_chart,
+        'challengesChart': challenges_chart,
+    },
+    'merchant-dashboard.html': {
+        'cardNetworkChart': card_network_chart,
+        'paymentChallengesChart': payment_challenges_chart,
+        'serviceFeesChart': service_fees_chart,
+    },
+}
+
+
+def page_snapshots(data):
+    """
+    Snapshot markup for every chart.
+    Returns: {page filename: {"snapshot-<canvas id>": svg}}
+    """
+    return {page: {f'snapshot-{canvas}': render(data) for canvas, render in charts.items()}
+            for page, charts in PAGE_CHARTS.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render static SVG snapshots of the dashboard charts.')
+    parser.add_argument('--data', default=DATA_JS, help='data.js to read dashboardData from')
+    parser.add_argument('--output', help='Also write each snapshot to this directory as <canvas id>.svg')
+    args = parser.parse_args()
+
+    try:
+        snapshots = page_snapshots(load_dashboard_data(args.data))
+    except (DataError, KeyError) as e:
+        print(f"ERROR: {e}")
+        return False
+
+    for page, slots in snapshots.items():
+        print(f"✓ {page}")
+        for slot, svg in slots.items():
+            print(f"  {slot}: {len(svg.encode('utf-8')):,} bytes")
+            if args.output:
+                os.makedirs(args.output, exist_ok=True)
+                with open(os.path.join(args.output, slot.replace('snapshot-', '') + '.svg'), 'w',
+                          encoding='utf-8') as f:
+                    f.write(svg.replace('<svg ', '<svg xmlns="http://www.w3.org/2000/svg" ', 1))
+    if args.output:
+        print(f"✓ Snapshots written to {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Build-time bar sparklines for the map tooltip.
+Lays out each country's last SPARKLINE_PERIODS values of a metric as a
+small SVG bar chart, so the tooltip only assembles a few elements instead
+of creating a Chart.js chart on every hover. Bar heights are computed for
+all countries at once with NumPy and shipped as whole pixels; the page
+builds the <rect>s from them and labels each bar with the value it
+already has in the asset's metrics.
+
+The <svg> element, the period labels and the bar geometry are the same
+for every country and stored once, as a frame the page wraps around each
+country's bars. The SVGs carry no colours or fonts: the page styles them
+through the .sparkline class, so one stylesheet rule covers every chart.
+"""
+
+import numpy as np
+
+SPARKLINE_PERIODS = 5
+
+WIDTH, HEIGHT = 260, 150
+TOP = 18     # room for the value labels
+BOTTOM = 18  # room for the period labels
+BAR_WIDTH = 0.6  # fraction of each period's slot
+CORNER = 3
+
+# Metrics shown on the map
+METRICS = ('absolute', 'gdp_percentage')
+
+
+def _number(value):
+    """Shortest SVG coordinate at 0.1 precision."""
+    return f'{value:.1f}'.rstrip('0').rstrip('.')
+
+
+def bar_centres(periods):
+    """x of the centre of each period's slot."""
+    return WIDTH / periods * (np.arange(periods) + 0.5)
+
+
+def bar_heights(block):
+    """
+    Bar heights in whole pixels for every row of a block (rows x periods),
+    scaled so each row's largest value fills the plot area. NaN and
+    non-positive values get height 0.
+    """
+    positive = np.where(np.isfinite(block) & (block > 0), block, 0.0)
+    peak = positive.max(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.rint(np.where(peak > 0, positive / peak * (HEIGHT - TOP - BOTTOM), 0.0)).astype(int)
+
+
+def render_frame(centres, labels):
+    """
+    The markup shared by every sparkline of a period window: the opening
+    <svg> tag with the period labels, and the closing tag.
+    Returns: (prefix, suffix)
+    """
+    periods = ''.join(f'<text class="period" x="{_number(centre)}" y="{HEIGHT - 4}">{label}</text>'
+                      for centre, label in zip(centres, labels))
+    return f'<svg class="sparkline" viewBox="0 0 {WIDTH} {HEIGHT}" role="img">{periods}', '</svg>'
+
+
+def row_heights(values, heights):
+    """One row's bar heights with null where there is no value, or None when the row has no values."""
+    if not np.isfinite(values).any():
+        return None
+    return [int(height) if np.isfinite(value) else None for value, height in zip(values, heights)]
+
+
+def build_sparklines(blocks, periods, count=SPARKLINE_PERIODS):
+    """
+    Sparkline layout for the last `count` periods of every metric in METRICS.
+    The page draws bar k of a country as a rect of bar.width centred on
+    bar.centres[k], rising heights[k] px from bar.base, wraps the bars in
+    frame[0] and frame[1], and labels them from the asset's metrics.
+    blocks: {metric: float array (countries x periods)}
+    Returns: {"periods": [...], "frame": [prefix, suffix],
+              "bar": {"width", "corner", "base", "centres"},
+              "heights": {metric: [[px or null per period] or None per country]}}
+    """
+    labels = list(periods)[-count:]
+    centres = bar_centres(len(labels))
+    heights = {}
+    for name in METRICS:
+        if name not in blocks:
+            continue
+        window = blocks[name][:, -len(labels):]
+        heights[name] = [row_heights(row, row_px) for row, row_px in zip(window, bar_heights(window))]
+    return {
+        'periods': labels,
+        'frame': list(render_frame(centres, labels)),
+        'bar': {
+            'width': round(WIDTH / len(labels) * BAR_WIDTH, 1),
+            'corner': CORNER,
+            'base': HEIGHT - BOTTOM,
+            'centres': [round(float(centre), 1) for centre in centres],
+        },
+        'heights': heights,
+    }
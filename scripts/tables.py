@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Shared typed loader for the country-by-period CSVs in data/.
+Discovers the period columns from the header (years such as "2018",
+quarters such as "2024Q1" / "2024-Q1" or months such as "2024-01" /
+"2024M01") instead of hard-coding them, and parses them all into one 2-D
+float array, so the same code path handles an 8-year table, a 60-year
+table or a monthly one.
+
+The same tables can also be stored column-wise (see columnar.py): an
+uncompressed Arrow IPC file (.arrow) is memory-mapped and its float64
+columns are used as they are, with no text parsing; Parquet (.parquet) is
+smaller but decoded on read. Both need the optional pyarrow package, and
+only the columns a caller asks for are read. CSV stays the export format.
+"""
+
+import os
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for .arrow / .parquet tables
+    pa = None
+
+HAVE_PYARROW = pa is not None
+
+KEY_COLUMN = 'Country'
+
+# Columnar formats in order of preference
+COLUMNAR_EXTENSIONS = ('.arrow', '.parquet')
+
+# "2018", "2024Q1", "2024-Q1", "2024 Q1", "2024_Q1", "2024-01", "2024M01"
+PERIOD_COLUMN = re.compile(
+    r'^(?P<year>\d{4})(?:[-_ ]?Q(?P<quarter>[1-4])|(?:[-_ ]|M)(?P<month>0[1-9]|1[0-2]))?$'
+)
+
+# frame: the parsed DataFrame (non-period columns such as Latitude are kept),
+#        or None when loaded with frame=False
+# index: pandas Index of the key column, one entry per row of values
+# columns: period column names in file order
+# values: float array of shape (len(index), len(columns)), NaN where empty
+Table = namedtuple('Table', ['frame', 'index', 'columns', 'values'])
+
+
+def period_columns(columns):
+    """Column names that look like a year, quarter or month, in their original order."""
+    return [col for col in columns if PERIOD_COLUMN.match(str(col).strip())]
+
+
+def period_year(column):
+    """Calendar year of a period column ("2024Q1" -> 2024, "2024-03" -> 2024)."""
+    return int(PERIOD_COLUMN.match(str(column).strip()).group('year'))
+
+
+def numeric_block(df, columns):
+    """
+    Return the given columns as a 2-D float array.
+    Strings with thousands separators ("1,234.5") are parsed; anything
+    that is not a number becomes NaN.
+    """
+    block = np.empty((len(df), len(columns)), dtype=float)
+    for i, col in enumerate(columns):
+        values = df[col]
+        if not pd.api.types.is_numeric_dtype(values):
+            values = values.astype(str).str.replace(',', '', regex=False)
+        block[:, i] = pd.to_numeric(values, errors='coerce')
+    return block
+
+
+def _require_pyarrow(filepath):
+    if not HAVE_PYARROW:
+        raise ImportError(f"{filepath}: Arrow and Parquet tables need the 'pyarrow' package")
+
+
+def columnar_names(filepath):
+    """Column names of an .arrow or .parquet file, read from its schema only."""
+    _require_pyarrow(filepath)
+    if filepath.endswith('.parquet'):
+        return pq.read_schema(filepath).names
+    with pa.memory_map(filepath, 'r') as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def read_columnar(filepath, columns=None):
+    """
+    Read an .arrow or .parquet file as a pyarrow Table, limited to `columns`.
+    Arrow files are memory-mapped, so the returned columns point straight
+    into the page cache and unused columns are never touched.
+    """
+    _require_pyarrow(filepath)
+    if filepath.endswith('.parquet'):
+        return pq.read_table(filepath, columns=columns, memory_map=True)
+    table = pa.ipc.open_file(pa.memory_map(filepath, 'r')).read_all()
+    return table if columns is None else table.select(columns)
+
+
+def write_columnar(df, filepath, key=KEY_COLUMN):
+    """
+    Write a country-by-period table as .arrow (uncompressed, so it can be
+    memory-mapped) or .parquet, with every period column typed float64.
+    """
+    _require_pyarrow(filepath)
+    df = df.copy()
+    columns = period_columns(df.columns)
+    df[columns] = numeric_block(df, columns)
+    df[key] = df[key].astype(str)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    partial = filepath + '.part'
+    if filepath.endswith('.parquet'):
+        pq.write_table(table, partial)
+    else:
+        feather.write_feather(table, partial, compression='uncompressed')
+    os.replace(partial, filepath)
+    return filepath
+
+
+def table_path(filepath):
+    """
+    The file to load for a CSV path: its .arrow or .parquet sibling when
+    pyarrow is installed and that copy is not older than the CSV, else the
+    CSV itself.
+    """
+    if not HAVE_PYARROW:
+        return filepath
+    stem = os.path.splitext(filepath)[0]
+    csv_time = os.path.getmtime(filepath) if os.path.exists(filepath) else None
+    for extension in COLUMNAR_EXTENSIONS:
+        candidate = stem + extension
+        if os.path.exists(candidate) and (csv_time is None or os.path.getmtime(candidate) >= csv_time):
+            return candidate
+    return filepath
+
+
+def _load_columnar(filepath, key, frame):
+    names = columnar_names(filepath)
+    columns = period_columns(names)
+    if key not in names:
+        raise ValueError(f"{filepath}: no '{key}' column")
+    if not columns:
+        raise ValueError(f"{filepath}: no year, quarter or month columns in schema")
+
+    table = read_columnar(filepath, None if frame else [key] + columns)
+    values = np.empty((table.num_rows, len(columns)), dtype=float)
+    for i, col in enumerate(columns):
+        values[:, i] = table.column(col).to_numpy()
+    index = pd.Index(table.column(key).to_pylist(), dtype=object)
+    df = table.to_pandas() if frame else None
+    return Table(df, index, columns, values)
+
+
+def load_table(filepath, key=KEY_COLUMN, frame=True):
+    """
+    Load a country-by-period table from .csv, .arrow or .parquet.
+    Thousands separators are handled by the CSV parser itself, so numeric
+    columns arrive as floats and only malformed cells need a second look.
+    With frame=False only the key and period columns are read and the
+    returned frame is None.
+    Returns: Table(frame, index, columns, values)
+    """
+    if filepath.endswith(COLUMNAR_EXTENSIONS):
+        return _load_columnar(filepath, key, frame)
+
+    header = pd.read_csv(filepath, nrows=0).columns
+    columns = period_columns(header)
+    if key not in header:
+        raise ValueError(f"{filepath}: no '{key}' column")
+    if not columns:
+        raise ValueError(f"{filepath}: no year, quarter or month columns in header")
+
+    usecols = None if frame else [key] + columns
+    dtypes = {key: str}
+    dtypes.update({col: 'float64' for col in columns})
+    try:
+        df = pd.read_csv(filepath, thousands=',', dtype=dtypes, usecols=usecols)
+    except ValueError:
+        # A non-numeric cell somewhere: read as text and coerce per column
+        df = pd.read_csv(filepath, thousands=',', dtype={key: str}, usecols=usecols)
+
+    return Table(df if frame else None, pd.Index(df[key]), columns, numeric_block(df, columns))
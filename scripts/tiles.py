@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Pre-render the payments choropleth as a vector tile pyramid.
+Joins the country boundaries to the payment data (see geometry.py),
+projects them to Web Mercator, clips them to every tile from MIN_ZOOM to
+MAX_ZOOM (the map's 0.5-4 zoom range) and encodes each tile as a Mapbox
+Vector Tile. Tiles are rendered in parallel across cores and written to
+an MBTiles archive (SQLite), so a tile server can hand the page only the
+tiles in view instead of all geometry up front.
+
+Runs offline on local files; the MVT protobuf encoding is done here, so
+no tiling libraries are needed.
+
+Usage:
+    python3 scripts/tiles.py                      # data/tiles/countries.mbtiles
+    python3 scripts/tiles.py --max-zoom 6 --workers 4
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import sqlite3
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import geometry
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+TILES_FILE = os.path.join(PROJECT_ROOT, 'data', 'tiles', 'countries.mbtiles')
+
+LAYER_NAME = 'countries'
+MIN_ZOOM = 0
+MAX_ZOOM = 4
+EXTENT = 4096
+BUFFER = 64          # tile units drawn outside each edge, hides seams between tiles
+TOLERANCE = 1.0      # simplification tolerance in tile units
+MAX_LATITUDE = 85.0511287798066
+
+
+# --- Protobuf wire format (only what MVT needs) ---
+
+def varint(value):
+    """Encode an unsigned integer as a protobuf varint."""
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+
+def field_varint(number, value):
+    return varint(number << 3) + varint(value)
+
+
+def field_bytes(number, payload):
+    return varint((number << 3) | 2) + varint(len(payload)) + payload
+
+
+def field_packed(number, values):
+    return field_bytes(number, b''.join(varint(v) for v in values))
+
+
+def encode_value(value):
+    """An MVT Value message: strings, doubles and integers."""
+    if isinstance(value, str):
+        return field_bytes(1, value.encode('utf-8'))
+    if isinstance(value, bool):
+        return field_varint(7, int(value))
+    if isinstance(value, int):
+        return field_varint(6, zigzag(value)) if value < 0 else field_varint(5, value)
+    return varint((3 << 3) | 1) + struct.pack('<d', float(value))
+
+
+# --- Geometry ---
+
+def project(lonlat):
+    """Longitude/latitude to Web Mercator in [0, 1] x [0, 1] (y down)."""
+    lon = lonlat[:, 0]
+    lat = np.radians(np.clip(lonlat[:, 1], -MAX_LATITUDE, MAX_LATITUDE))
+    x = (lon + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / math.pi) / 2.0
+    return np.column_stack([x, y])
+
+
+def clip_ring(points, low, high):
+    """
+    Sutherland-Hodgman clip of an open ring against the square [low, high]^2,
+    one vectorized pass per edge.
+    """
+    for axis, bound, keep_greater in ((0, low, True), (0, high, False), (1, low, True), (1, high, False)):
+        if len(points) == 0:
+            break
+        inside = points[:, axis] >= bound if keep_greater else points[:, axis] <= bound
+        if inside.all():
+            continue
+        previous = np.roll(points, 1, axis=0)
+        crossing = inside != np.roll(inside, 1)
+
+        delta = points[:, axis] - previous[:, axis]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.where(crossing, (bound - previous[:, axis]) / delta, 0.0)
+        intersections = previous + t[:, None] * (points - previous)
+
+        # For each vertex: the crossing point (if any) then the vertex (if inside)
+        candidates = np.stack([intersections, points], axis=1)
+        points = candidates[np.column_stack([crossing, inside])]
+    return points
+
+
+def ring_area(points):
+    """Signed area (shoelace); positive is clockwise with y pointing down."""
+    x, y = points[:, 0], points[:, 1]
+    return float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)) / 2
+
+
+def encode_rings(rings):
+    """MVT polygon geometry commands for integer rings (exterior first)."""
+    commands = []
+    cursor = (0, 0)
+    for ring in rings:
+        dx = np.diff(np.vstack([cursor, ring]), axis=0).astype(np.int64)
+        commands.append((1 & 0x7) | (1 << 3))                # MoveTo 1
+        commands += [zigzag(int(dx[0, 0])), zigzag(int(dx[0, 1]))]
+        commands.append((2 & 0x7) | ((len(ring) - 1) << 3))  # LineTo n-1
+        for step in dx[1:]:
+            commands += [zigzag(int(step[0])), zigzag(int(step[1]))]
+        commands.append((7 & 0x7) | (1 << 3))                # ClosePath
+        cursor = tuple(ring[-1])
+    return commands
+
+
+def tile_polygon(polygon, z, x, y):
+    """
+    One projected polygon (list of rings) in the coordinates of tile z/x/y:
+    clipped, simplified, rounded to integers and wound as MVT requires
+    (exterior clockwise, holes counter-clockwise). None if nothing is left.
+    """
+    scale = (1 << z) * EXTENT
+    rings = []
+    for i, ring in enumerate(polygon):
+        points = ring[:-1] * scale - np.array([x * EXTENT, y * EXTENT])
+        points = clip_ring(points, -BUFFER, EXTENT + BUFFER)
+        if len(points) < 3:
+            if i == 0:
+                return None
+            continue
+        closed = np.vstack([points, points[:1]])
+        points = np.round(geometry.simplify_line(closed, TOLERANCE)).astype(np.int64)[:-1]
+        repeated = np.zeros(len(points), dtype=bool)
+        repeated[1:] = (points[1:] == points[:-1]).all(axis=1)
+        points = points[~repeated]
+        if len(points) < 3 or ring_area(points) == 0:
+            if i == 0:
+                return None
+            continue
+        if (ring_area(points) > 0) != (i == 0):
+            points = points[::-1]
+        rings.append(points)
+    return rings or None
+
+
+def encode_tile(features, z, x, y):
+    """
+    Encode the features overlapping tile z/x/y as one MVT layer.
+    features: list of (id, properties, [projected polygons])
+    Returns: protobuf bytes, or None if the tile is empty
+    """
+    keys, values = [], []
+    key_index, value_index = {}, {}
+    encoded = []
+
+    for feature_id, properties, polygons in features:
+        rings = []
+        for polygon in polygons:
+            rings += tile_polygon(polygon, z, x, y) or []
+        if not rings:
+            continue
+
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            if key not in key_index:
+                key_index[key] = len(keys)
+                keys.append(key)
+            value_key = (type(value).__name__, value)
+            if value_key not in value_index:
+                value_index[value_key] = len(values)
+                values.append(value)
+            tags += [key_index[key], value_index[value_key]]
+
+        encoded.append(field_varint(1, feature_id) + field_packed(2, tags)
+                       + field_varint(3, 3) + field_packed(4, encode_rings(rings)))
+
+    if not encoded:
+        return None
+
+    layer = field_varint(15, 2) + field_bytes(1, LAYER_NAME.encode('utf-8'))
+    layer += b''.join(field_bytes(2, feature) for feature in encoded)
+    layer += b''.join(field_bytes(3, key.encode('utf-8')) for key in keys)
+    layer += b''.join(field_bytes(4, encode_value(value)) for value in values)
+    layer += field_varint(5, EXTENT)
+    return field_bytes(3, layer)
+
+
+def project_collection(collection):
+    """
+    Project a GeoJSON FeatureCollection to Web Mercator.
+    Returns: list of (id, properties, [polygons as lists of (n, 2) arrays], bbox)
+    """
+    projected = []
+    for index, feature in enumerate(collection['features']):
+        geom = feature['geometry']
+        polygons = [geom['coordinates']] if geom['type'] == 'Polygon' else geom['coordinates']
+        polygons = [[project(np.asarray(ring, dtype=float)[:, :2]) for ring in polygon] for polygon in polygons]
+        exteriors = np.vstack([polygon[0] for polygon in polygons])
+        bbox = (*exteriors.min(axis=0), *exteriors.max(axis=0))
+        projected.append((feature.get('id', index), feature['properties'], polygons, bbox))
+    return projected
+
+
+# --- Parallel rendering ---
+
+_FEATURES = None
+
+
+def _init_worker(features):
+    global _FEATURES
+    _FEATURES = features
+
+
+def _render_tile(tile):
+    z, x, y = tile
+    size = 1.0 / (1 << z)
+    pad = size * BUFFER / EXTENT
+    x0, y0 = x * size - pad, y * size - pad
+    x1, y1 = (x + 1) * size + pad, (y + 1) * size + pad
+
+    overlapping = [(fid, props, polygons) for fid, props, polygons, (bx0, by0, bx1, by1) in _FEATURES
+                   if bx0 <= x1 and bx1 >= x0 and by0 <= y1 and by1 >= y0]
+    data = encode_tile(overlapping, z, x, y) if overlapping else None
+    # gzip with mtime=0 so identical tiles give identical bytes
+    return tile, gzip.compress(data, compresslevel=9, mtime=0) if data else None
+
+
+def tile_range(features, z):
+    """Tiles at zoom z that any feature's bounding box touches."""
+    n = 1 << z
+    tiles = set()
+    for _, _, _, (bx0, by0, bx1, by1) in features:
+        for x in range(max(0, int(bx0 * n)), min(n - 1, int(bx1 * n)) + 1):
+            for y in range(max(0, int(by0 * n)), min(n - 1, int(by1 * n)) + 1):
+                tiles.add((z, x, y))
+    return sorted(tiles)
+
+
+def render_tiles(features, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM, workers=None):
+    """
+    Render every non-empty tile across the zoom range.
+    Yields (z, x, y, gzipped tile bytes) in z/x/y order.
+    """
+    tiles = [tile for z in range(min_zoom, max_zoom + 1) for tile in tile_range(features, z)]
+    if workers == 1:
+        _init_worker(features)
+        results = map(_render_tile, tiles)
+        for (z, x, y), data in results:
+            if data:
+                yield z, x, y, data
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(features,)) as pool:
+        for (z, x, y), data in pool.map(_render_tile, tiles, chunksize=8):
+            if data:
+                yield z, x, y, data
+
+
+# --- MBTiles ---
+
+def write_mbtiles(path, tiles, metadata):
+    """
+    Write tiles into a fresh MBTiles file (rows are TMS, y flipped).
+    Returns: number of tiles written
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    partial = path + '.part'
+    if os.path.exists(partial):
+        os.remove(partial)
+
+    conn = sqlite3.connect(partial)
+    try:
+        conn.execute('CREATE TABLE metadata (name TEXT, value TEXT)')
+        conn.execute('CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, '
+                     'tile_row INTEGER, tile_data BLOB)')
+        conn.execute('CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row)')
+        count = 0
+        for z, x, y, data in tiles:
+            conn.execute('INSERT INTO tiles VALUES (?, ?, ?, ?)', (z, x, (1 << z) - 1 - y, data))
+            count += 1
+        conn.executemany('INSERT INTO metadata VALUES (?, ?)', sorted(metadata.items()))
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(partial, path)
+    return count
+
+
+def tiles_metadata(collection, min_zoom, max_zoom):
+    """MBTiles metadata, including the vector_layers description."""
+    fields = {}
+    for feature in collection['features']:
+        for key, value in feature['properties'].items():
+            if value is not None:
+                fields[key] = 'String' if isinstance(value, str) else 'Number'
+    return {
+        'name': LAYER_NAME,
+        'format': 'pbf',
+        'type': 'overlay',
+        'version': '1',
+        'description': 'Payments choropleth by country',
+        'minzoom': str(min_zoom),
+        'maxzoom': str(max_zoom),
+        'bounds': '-180.0,-85.0511,180.0,85.0511',
+        'center': '0,10,1',
+        'json': json.dumps({'vector_layers': [{
+            'id': LAYER_NAME, 'fields': dict(sorted(fields.items())),
+            'minzoom': min_zoom, 'maxzoom': max_zoom,
+        }]}, sort_keys=True),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render the payments choropleth as vector tiles.')
+    parser.add_argument('--source', default=geometry.SOURCE_FILE, help='Boundary GeoJSON (Natural Earth layout)')
+    parser.add_argument('--output', default=TILES_FILE, help='MBTiles file to write')
+    parser.add_argument('--min-zoom', type=int, default=MIN_ZOOM)
+    parser.add_argument('--max-zoom', type=int, default=MAX_ZOOM)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: one per core; 1 renders in-process)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"❌ {args.source} not found (run geometry.py --fetch to download it)")
+        return False
+
+    import export_data
+
+    start = time.perf_counter()
+    print(f"Joining {os.path.basename(args.source)} to the payment data...")
+    # Full precision here: each zoom level is simplified in tile units instead
+    collection = geometry.build_geometry(args.source, export_data.build_asset(), tolerance=0, precision=6)
+    features = project_collection(collection)
+    print(f"✓ {len(features)} countries")
+
+    print(f"Rendering zoom {args.min_zoom}-{args.max_zoom}...")
+    count = write_mbtiles(args.output,
+                          render_tiles(features, args.min_zoom, args.max_zoom, args.workers),
+                          tiles_metadata(collection, args.min_zoom, args.max_zoom))
+
+    size = os.path.getsize(args.output)
+    print(f"✓ Wrote {count} tiles to {os.path.relpath(args.output, PROJECT_ROOT)} "
+          f"({size:,} bytes) in {time.perf_counter() - start:.1f}s")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Reusable World Bank API client.
+Uses one pooled requests.Session, batches several countries per request,
+runs batches concurrently behind a token-bucket rate limiter and retries
+failed requests with exponential backoff. Responses are walked page by
+page and stream-parsed, so memory stays flat on large queries.
+"""
+
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from population_cache import POPULATION_INDICATOR
+
+WORLD_BANK_BASE_URL = "https://api.worldbank.org/v2"
+
+# Status codes worth retrying: rate limited or a temporary server problem
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Records per page; larger results are walked page by page
+PER_PAGE = 1000
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+def iter_response_records(chunks):
+    """
+    Incrementally parse a World Bank response body, [metadata, [record, ...]],
+    from an iterable of text chunks.
+    Yields the metadata object first, then each record as soon as it is
+    complete, so only one record is held in memory at a time.
+    """
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    exhausted = False
+
+    def fill():
+        # Read another chunk, dropping the part of the buffer already consumed
+        nonlocal buffer, pos, exhausted
+        for chunk in chunks:
+            if chunk:
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                return True
+        exhausted = True
+        return False
+
+    def next_char():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not fill():
+                raise ValueError("Unexpected end of World Bank response")
+
+    def expect(char):
+        nonlocal pos
+        if next_char() != char:
+            raise ValueError(f"Expected {char!r} in World Bank response, got {buffer[pos]!r}")
+        pos += 1
+
+    def decode():
+        nonlocal pos
+        next_char()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(buffer, pos)
+                # A value touching the end of the buffer may be cut short
+                if end < len(buffer) or exhausted:
+                    pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+            if not fill():
+                obj, pos = _decoder.raw_decode(buffer, pos)
+                return obj
+
+    expect("[")
+    yield decode()
+
+    if next_char() == "]":
+        return
+    expect(",")
+
+    if next_char() == "n":
+        # "null" when the query matched nothing
+        decode()
+        return
+
+    expect("[")
+    if next_char() == "]":
+        return
+    while True:
+        yield decode()
+        if next_char() == "]":
+            return
+        expect(",")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows `rate` requests per second on average
+    with bursts of up to `capacity` requests.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a token is available, then take it.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class WorldBankClient:
+    """
+    Client for the World Bank indicators API.
+    base_url can point at a local stub server for testing.
+    """
+
+    def __init__(self, base_url=WORLD_BANK_BASE_URL, max_workers=8, rate=10, retries=3,
+                 backoff=0.5, timeout=30, batch_size=50):
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.bucket = TokenBucket(rate)
+
+        # One connection per worker, reused across requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, path, params, stream=False):
+        """
+        GET a path relative to base_url and return the response.
+        Retries connection errors, timeouts and 429/5xx responses.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout, stream=stream)
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    return response
+                response.close()
+                error = requests.HTTPError(f"{response.status_code} for {response.url}", response=response)
+                retry_after = response.headers.get("Retry-After")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+                retry_after = None
+
+            if attempt == self.retries:
+                raise error
+
+            # Exponential backoff with jitter, unless the server says how long to wait
+            if retry_after and retry_after.isdigit():
+                delay = float(retry_after)
+            else:
+                delay = self.backoff * (2 ** attempt) * (1 + random.random())
+            time.sleep(delay)
+
+    def get_json(self, path, params):
+        """
+        GET a path relative to base_url and decode the JSON body.
+        """
+        return self.request(path, params).json()
+
+    def iter_indicator(self, country_codes, years=None, indicator=POPULATION_INDICATOR,
+                       per_page=PER_PAGE):
+        """
+        Walk every page of an indicator query, stream-parsing each page.
+        country_codes may be a list of ISO3 codes or "all"; years=None keeps every year.
+        Yields (country_code, year, value) as records arrive; value is None
+        where the source has no data.
+        """
+        codes = country_codes if isinstance(country_codes, str) else ";".join(country_codes)
+        wanted = set(years) if years is not None else None
+        params = {"format": "json", "per_page": per_page}
+        if wanted:
+            params["date"] = f"{min(wanted)}:{max(wanted)}"
+
+        page = 1
+        pages = 1
+        while page <= pages:
+            response = self.request(f"country/{codes}/indicator/{indicator}",
+                                    dict(params, page=page), stream=True)
+            with response:
+                response.encoding = response.encoding or "utf-8"
+                chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE, decode_unicode=True)
+                stream = iter_response_records(chunks)
+
+                # API returns [metadata, records]; metadata says how many pages there are
+                meta = next(stream)
+                if "message" in meta:
+                    raise ValueError(f"World Bank API error: {meta['message']}")
+                pages = int(meta.get("pages") or 1)
+
+                for record in stream:
+                    country_code = record.get("countryiso3code") or record.get("countryCode")
+                    try:
+                        year = int(record.get("date", 0))
+                    except (ValueError, TypeError):
+                        continue
+                    if not country_code or (wanted is not None and year not in wanted):
+                        continue
+
+                    value = record.get("value")
+                    try:
+                        value = float(value) if value is not None else None
+                    except (ValueError, TypeError):
+                        value = None
+                    yield country_code, year, value
+            page += 1
+
+    def fetch_batch(self, country_codes, years, indicator=POPULATION_INDICATOR):
+        """
+        Fetch one indicator for several countries in a single paginated query.
+        Returns: [(country_code, year, value)] for the requested years
+        """
+        return [record for record in self.iter_indicator(country_codes, years, indicator)
+                if record[2] is not None]
+
+    def fetch_indicator(self, country_codes, years, indicator=POPULATION_INDICATOR):
+        """
+        Fetch one indicator for many countries, batch_size countries per
+        request with up to max_workers requests in flight.
+        Returns: ({country_code: {year: value}}, [country codes whose batch failed])
+        """
+        country_codes = list(dict.fromkeys(country_codes))
+        batches = [country_codes[i:i + self.batch_size]
+                   for i in range(0, len(country_codes), self.batch_size)]
+
+        values = {}
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.fetch_batch, batch, years, indicator): batch
+                       for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    records = future.result()
+                except Exception as e:
+                    print(f"Error fetching {indicator} for {len(batch)} countries: {e}")
+                    failed.extend(batch)
+                    continue
+                for country_code, year, value in records:
+                    values.setdefault(country_code, {})[year] = value
+
+        return values, failed
@@ -231,6 +231,81 @@ const dashboardData = {
             year: 2021,
             source: 'Tranglo'
         }
+    },
+
+    // Investment Priorities (Industry Outlook page)
+    investmentPriorities: {
+        labels: [
+            'AI',
+            'Cross-border\npayments',
+            'Real-time\npayments',
+            'Customer experience',
+            'Embedded\ncommerce',
+            'Open banking',
+            'Other',
+            'Digital currencies',
+            'Digital wallets',
+            'Blockchain\ntechnology',
+            'Financial inclusion\n& ESG'
+        ],
+        data: [18, 12, 12, 11, 10, 8, 8, 7, 6, 4, 4],
+        source: 'PAY360 2025 State of the Industry Survey'
+    },
+
+    // Business Sentiment (Industry Outlook page)
+    sentiment: {
+        labels: ['Positive', 'Very Positive', 'Neutral', 'Negative'],
+        data: [55, 20, 20, 4],
+        source: 'PAY360 2025 State of the Industry Survey'
+    },
+
+    // Card Networks in Circulation, billions (Merchant page)
+    cardNetworks: {
+        labels: ['Visa', 'Mastercard', 'UnionPay', 'Amex', 'Discover'],
+        data: [4.7, 3.158, 9.6, 0.141, 0.0715],
+        source: 'CoinLaw & industry report 2025'
+    },
+
+    // Payment Challenges by Severity, % of merchants (Merchant page)
+    paymentChallenges: {
+        labels: [
+            'High transaction fees',
+            'Increasing risk of fraud',
+            'Changing customer preferences',
+            'Lack of payment data access',
+            'Cart abandonment',
+            'Limited alternative methods',
+            'Settlement delays',
+            'Compliance/regulatory',
+            'Difficulty switching providers'
+        ],
+        datasets: [
+            {
+                label: 'Extremely Challenging',
+                data: [26.0, 29.3, 14.6, 18.7, 21.3, 18.5, 21.7, 22.8, 14.9]
+            },
+            {
+                label: 'Somewhat Challenging',
+                data: [47.2, 34.1, 38.2, 36.6, 37.7, 37.0, 45.0, 44.7, 38.8]
+            },
+            {
+                label: 'Not Really Challenging',
+                data: [18.7, 26.0, 29.3, 31.7, 29.5, 31.9, 26.7, 22.0, 32.2]
+            },
+            {
+                label: 'Not At All Challenging',
+                data: [8.1, 10.6, 17.9, 13.0, 11.5, 12.6, 6.6, 10.5, 14.1]
+            }
+        ],
+        source: 'Payments Intelligence Merchant Survey 2025'
+    },
+
+    // Merchant Service Fees, midpoint of each range in % (Merchant page)
+    serviceFees: {
+        labels: ['Credit cards', 'Debit cards', 'BNPL services', 'Digital wallets', 'Digital currencies'],
+        data: [2.5, 1.0, 4.25, 1.5, 0.5],
+        ranges: ['1.5%-3.5%', '0.5%-1.5%', '1.5%-7.0%', '1.0%-2.0%', '0.01% + optional'],
+        source: 'The Motley Fool merchant service comparison (2025)'
     }
 };
 